@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from fast_zero.app import app
+from fast_zero.database import get_session
+from fast_zero.models import Base, User
+from fast_zero.ratelimit import NullRateLimitBackend, rate_limiter
+from fast_zero.security import create_access_token
+
+EMAIL = 'benchmark@example.com'
+
+
+@contextmanager
+def api_client(directory: str):
+    path = Path(directory) / 'benchmark.db'
+    sync_engine = create_engine(f'sqlite:///{path}')
+    Base.metadata.create_all(sync_engine)
+
+    with Session(sync_engine) as session:
+        session.add(User(username='benchmark', email=EMAIL, password='-'))
+        session.commit()
+
+    engine = create_async_engine(f'sqlite+aiosqlite:///{path}')
+
+    async def get_session_override():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    backend = rate_limiter.backend
+    rate_limiter.backend = NullRateLimitBackend()
+    token = create_access_token(data={'sub': EMAIL})
+
+    with TestClient(app) as client:
+        client.headers['Authorization'] = f'Bearer {token}'
+        yield client
+        client.portal.call(engine.dispose)
+
+    app.dependency_overrides.clear()
+    rate_limiter.backend = backend
+    sync_engine.dispose()
@@ -0,0 +1,50 @@
+import argparse
+import time
+
+from fastapi.responses import JSONResponse
+
+from fast_zero.responses import FastJSONResponse
+from fast_zero.schemas import ListTodos, TodoPublic
+
+
+def page(size: int):
+    return ListTodos(
+        todos=[
+            TodoPublic(
+                id=number,
+                title=f'todo {number}',
+                description='some description',
+                state='todo',
+            )
+            for number in range(size)
+        ]
+    ).model_dump(mode='json')
+
+
+def measure(response_class, content, repeat: int):
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        response_class(content)
+
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON rendering speed')
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    for size in (10, 100, 1000):
+        content = page(size)
+        stdlib = measure(JSONResponse, content, args.repeat)
+        fast = measure(FastJSONResponse, content, args.repeat)
+
+        print(
+            f'{size:>5} todos  json={stdlib:9.1f}us  orjson={fast:9.1f}us  '
+            f'speedup={stdlib / fast:5.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
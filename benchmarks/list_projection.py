@@ -0,0 +1,81 @@
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from fast_zero.models import Base, Todo, TodoState, User
+from fast_zero.routes.todos import TODO_PUBLIC_COLUMNS
+from fast_zero.schemas import ListTodos
+
+
+def load_entities(session: Session):
+    todos = session.scalars(select(Todo).where(Todo.user_id == 1)).all()
+    return ListTodos.model_validate({'todos': todos})
+
+
+def load_columns(session: Session):
+    query = select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == 1)
+    todos = [row._asdict() for row in session.execute(query)]
+    return ListTodos.model_validate({'todos': todos})
+
+
+def measure(engine, load, repeat: int):
+    with Session(engine) as session:
+        tracemalloc.start()
+        load(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        with Session(engine) as session:
+            load(session)
+
+    return (time.perf_counter() - start) / repeat * 1000, peak / 1024**2
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List query projection')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f'sqlite:///{Path(directory) / "b.db"}')
+        Base.metadata.create_all(engine)
+
+        with engine.begin() as connection:
+            connection.execute(
+                insert(User),
+                [{'username': 'a', 'email': 'a', 'password': 'a'}],
+            )
+            connection.execute(
+                insert(Todo),
+                [
+                    {
+                        'title': f'todo {number}',
+                        'description': 'some description',
+                        'state': TodoState.todo,
+                        'user_id': 1,
+                    }
+                    for number in range(args.rows)
+                ],
+            )
+
+        for name, load in (
+            ('entities', load_entities),
+            ('columns', load_columns),
+        ):
+            elapsed, peak = measure(engine, load, args.repeat)
+            print(f'{name:<9} {elapsed:8.1f}ms  peak={peak:6.1f}MiB')
+
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
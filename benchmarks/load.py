@@ -0,0 +1,447 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from statistics import quantiles
+
+import factory
+import httpx
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from fast_zero.app import app
+from fast_zero.database import get_session
+from fast_zero.models import Base, Todo, User
+from fast_zero.ratelimit import NullRateLimitBackend, rate_limiter
+from fast_zero.security import create_access_token, get_password_hash
+from tests.factories import TodoFactory, UserFactory
+
+BASELINE = Path(__file__).with_name('baseline.json')
+EMAIL = 'benchmark@example.com'
+PASSWORD = 'benchmark'
+
+
+def todo(number: int):
+    return {'title': f'todo {number}', 'description': '-', 'state': 'todo'}
+
+
+def build_users(count: int, **overrides):
+    users = factory.build_batch(
+        dict, count, FACTORY_CLASS=UserFactory, **overrides
+    )
+    for user in users:
+        del user['id']
+
+    return users
+
+
+async def seed(url: str, users: int, todos: int, todos_per_user: int):
+    engine = create_async_engine(url)
+    password = get_password_hash(PASSWORD)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        await session.execute(
+            insert(User),
+            build_users(
+                1, username='benchmark', email=EMAIL, password=password
+            )
+            + build_users(users, password=password),
+        )
+        rows = (await session.execute(select(User.id, User.email))).all()
+        user_id = next(id for id, email in rows if email == EMAIL)
+
+        for owner, count in [(user_id, todos)] + [
+            (id, todos_per_user) for id, email in rows if email != EMAIL
+        ]:
+            if count:
+                await session.execute(
+                    insert(Todo),
+                    factory.build_batch(
+                        dict, count, FACTORY_CLASS=TodoFactory, user_id=owner
+                    ),
+                )
+
+        todo_ids = list(
+            await session.scalars(
+                select(Todo.id)
+                .where(Todo.user_id == user_id)
+                .order_by(Todo.id)
+            )
+        )
+        await session.commit()
+
+    await engine.dispose()
+
+    return {
+        'user_id': user_id,
+        'token': create_access_token(data={'sub': EMAIL}),
+        'todo_ids': todo_ids,
+        'users': [
+            (id, create_access_token(data={'sub': email}))
+            for id, email in rows
+            if email != EMAIL
+        ],
+    }
+
+
+def auth(context, token=None):
+    return {'Authorization': f'Bearer {token or context["token"]}'}
+
+
+def pick(items, number: int):
+    return items[number % len(items)]
+
+
+SCENARIOS = {
+    'GET /': lambda n, c: {'method': 'GET', 'url': '/'},
+    'GET /metrics': lambda n, c: {'method': 'GET', 'url': '/metrics'},
+    'GET /users/': lambda n, c: {'method': 'GET', 'url': '/users/'},
+    'POST /users/': lambda n, c: {
+        'method': 'POST',
+        'url': '/users/',
+        'json': {
+            'username': f'load{n}',
+            'email': f'load{n}@example.com',
+            'password': PASSWORD,
+        },
+    },
+    'POST /auth/token': lambda n, c: {
+        'method': 'POST',
+        'url': '/auth/token',
+        'data': {'username': EMAIL, 'password': PASSWORD},
+    },
+    'POST /auth/refresh_token': lambda n, c: {
+        'method': 'POST',
+        'url': '/auth/refresh_token',
+        'headers': auth(c),
+    },
+    'PUT /users/{id}': lambda n, c: {
+        'method': 'PUT',
+        'url': f'/users/{c["user_id"]}',
+        'headers': auth(c),
+        'json': {
+            'username': 'benchmark',
+            'email': EMAIL,
+            'password': PASSWORD,
+        },
+    },
+    'GET /todos/': lambda n, c: {
+        'method': 'GET',
+        'url': '/todos/',
+        'headers': auth(c),
+    },
+    'GET /todos/?offset': lambda n, c: {
+        'method': 'GET',
+        'url': f'/todos/?offset={n % 10 * 50}&limit=50',
+        'headers': auth(c),
+    },
+    'GET /todos/?title': lambda n, c: {
+        'method': 'GET',
+        'url': '/todos/?title=the',
+        'headers': auth(c),
+    },
+    'GET /todos/stats': lambda n, c: {
+        'method': 'GET',
+        'url': '/todos/stats',
+        'headers': auth(c),
+    },
+    'GET /todos/export': lambda n, c: {
+        'method': 'GET',
+        'url': '/todos/export',
+        'headers': auth(c),
+    },
+    'POST /todos/': lambda n, c: {
+        'method': 'POST',
+        'url': '/todos/',
+        'headers': auth(c),
+        'json': todo(n),
+    },
+    'POST /todos/bulk': lambda n, c: {
+        'method': 'POST',
+        'url': '/todos/bulk',
+        'headers': auth(c),
+        'json': [todo(n) for n in range(100)],
+    },
+    'POST /todos/import': lambda n, c: {
+        'method': 'POST',
+        'url': '/todos/import',
+        'headers': auth(c),
+        'content': ''.join(json.dumps(todo(n)) + '\n' for n in range(100)),
+    },
+    'PATCH /todos/{id}': lambda n, c: {
+        'method': 'PATCH',
+        'url': f'/todos/{pick(c["todo_ids"], n)}',
+        'headers': auth(c),
+        'json': {'title': f'patched {n}'},
+    },
+    'PATCH /todos/bulk': lambda n, c: {
+        'method': 'PATCH',
+        'url': '/todos/bulk',
+        'headers': auth(c),
+        'json': [
+            {'id': pick(c['todo_ids'], n * 10 + i), 'title': f'bulk {n}'}
+            for i in range(10)
+        ],
+    },
+    'DELETE /todos/{id}': lambda n, c: {
+        'method': 'DELETE',
+        'url': f'/todos/{pick(c["todo_ids"], n)}',
+        'headers': auth(c),
+    },
+    'POST /todos/bulk/delete': lambda n, c: {
+        'method': 'POST',
+        'url': '/todos/bulk/delete',
+        'headers': auth(c),
+        'json': [pick(c['todo_ids'], n * 10 + i) for i in range(10)],
+    },
+    'DELETE /users/{id}': lambda n, c: {
+        'method': 'DELETE',
+        'url': f'/users/{pick(c["users"], n)[0]}',
+        'headers': auth(c, pick(c['users'], n)[1]),
+    },
+}
+
+
+def summarize(latencies: list[float], elapsed: float, statuses: Counter):
+    cuts = quantiles(latencies, n=100, method='inclusive')
+
+    return {
+        'p50_ms': cuts[49] * 1000,
+        'p95_ms': cuts[94] * 1000,
+        'p99_ms': cuts[98] * 1000,
+        'rps': len(latencies) / elapsed,
+        'statuses': {str(code): statuses[code] for code in sorted(statuses)},
+    }
+
+
+async def run_scenario(client, build, context, requests: int, concurrency):
+    numbers = iter(range(requests))
+    latencies = []
+    statuses = Counter()
+
+    async def worker():
+        for number in numbers:
+            request = build(number, context)
+            start = time.perf_counter()
+            response = await client.request(**request)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return summarize(latencies, time.perf_counter() - start, statuses)
+
+
+async def run_scenarios(client, context, args):
+    results = {}
+
+    for name, build in SCENARIOS.items():
+        if args.scenario and args.scenario not in name:
+            continue
+
+        results[name] = await run_scenario(
+            client, build, context, args.requests, args.concurrency
+        )
+
+    return results
+
+
+async def run_asgi(url: str, context, args):
+    engine = create_async_engine(url)
+
+    async def get_session_override():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    backend = rate_limiter.backend
+    rate_limiter.backend = NullRateLimitBackend()
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url='http://benchmark'
+        ) as client:
+            return await run_scenarios(client, context, args)
+    finally:
+        app.dependency_overrides.clear()
+        rate_limiter.backend = backend
+        await engine.dispose()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(client, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            await client.get('/')
+            return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run_uvicorn(url: str, context, args):
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            '-m',
+            'uvicorn',
+            'fast_zero.app:app',
+            '--port',
+            str(port),
+            '--log-level',
+            'warning',
+        ],
+        env={**os.environ, 'DATABASE_URL': url, 'RATE_LIMIT_BACKEND': 'none'},
+    )
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    try:
+        async with httpx.AsyncClient(
+            base_url=f'http://127.0.0.1:{port}', limits=limits, timeout=60
+        ) as client:
+            await wait_until_ready(client)
+            return await run_scenarios(client, context, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+TRANSPORTS = {'asgi': run_asgi, 'uvicorn': run_uvicorn}
+
+
+def errors(result):
+    return {
+        code: count
+        for code, count in result['statuses'].items()
+        if not code.startswith(('2', '3'))
+    }
+
+
+def compare(results, baseline, tolerance: float):
+    regressions = []
+
+    for transport, scenarios in results.items():
+        for name, result in scenarios.items():
+            base = baseline.get(transport, {}).get(name)
+
+            if base is None:
+                continue
+
+            if result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+                regressions.append(
+                    f'{transport} {name}: p95 {result["p95_ms"]:.2f}ms '
+                    f'> baseline {base["p95_ms"]:.2f}ms'
+                )
+            if result['rps'] < base['rps'] * (1 - tolerance):
+                regressions.append(
+                    f'{transport} {name}: {result["rps"]:.1f} req/s '
+                    f'< baseline {base["rps"]:.1f} req/s'
+                )
+            if errors(result) != errors(base):
+                regressions.append(
+                    f'{transport} {name}: errors {errors(result)} '
+                    f'!= baseline {errors(base)}'
+                )
+
+    return regressions
+
+
+def report(results):
+    print(
+        f'{"transport":<9} {"scenario":<25} {"p50 ms":>9} {"p95 ms":>9} '
+        f'{"p99 ms":>9} {"req/s":>9}  statuses'
+    )
+
+    for transport, scenarios in results.items():
+        for name, r in scenarios.items():
+            statuses = ' '.join(f'{k}:{v}' for k, v in r['statuses'].items())
+            print(
+                f'{transport:<9} {name:<25} {r["p50_ms"]:9.2f} '
+                f'{r["p95_ms"]:9.2f} {r["p99_ms"]:9.2f} {r["rps"]:9.1f}  '
+                f'{statuses}'
+            )
+
+
+async def run(args, directory: str):
+    results = {}
+
+    for transport in args.transport:
+        # SQLite allows a single writer at a time: concurrent bulk inserts
+        # can wait out the default 5s busy timeout and fail with "database
+        # is locked", so let them queue for longer instead.
+        url = args.database_url or (
+            f'sqlite+aiosqlite:///{Path(directory) / f"{transport}.db"}'
+            '?timeout=30'
+        )
+        context = await seed(url, args.users, args.todos, args.todos_per_user)
+        results[transport] = await TRANSPORTS[transport](url, context, args)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API load benchmark')
+    parser.add_argument('--database-url')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--todos', type=int, default=1000)
+    parser.add_argument('--todos-per-user', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument(
+        '--transport',
+        nargs='+',
+        choices=TRANSPORTS,
+        default=list(TRANSPORTS),
+    )
+    parser.add_argument('--scenario', help='only run matching scenarios')
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = asyncio.run(run(args, directory))
+
+    report(results)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + '\n')
+        return
+
+    if not args.baseline.exists():
+        return
+
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.tolerance
+    )
+
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fast_zero.instrumentation import MetricsMiddleware
+
+SCOPE = {
+    'type': 'http',
+    'method': 'GET',
+    'path': '/todos/',
+    'route': SimpleNamespace(path='/todos/'),
+}
+
+
+async def endpoint(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def receive():
+    return {'type': 'http.request'}
+
+
+async def send(message):
+    pass
+
+
+async def measure(app, requests: int):
+    start = time.perf_counter()
+
+    for _ in range(requests):
+        await app(SCOPE, receive, send)
+
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Metrics middleware cost')
+    parser.add_argument('--requests', type=int, default=200_000)
+    args = parser.parse_args()
+
+    bare = asyncio.run(measure(endpoint, args.requests))
+    wrapped = asyncio.run(measure(MetricsMiddleware(endpoint), args.requests))
+
+    print(f'bare     {bare:6.2f}us/request')
+    print(f'metrics  {wrapped:6.2f}us/request')
+    print(f'overhead {wrapped - bare:6.2f}us/request')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import time
+
+from fast_zero.security import create_password_context
+
+CONFIGURATIONS = [
+    ('bcrypt', 10),
+    ('bcrypt', 12),
+    ('scrypt', 14),
+    ('scrypt', 16),
+]
+
+
+def measure(func, duration: float):
+    count = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < duration:
+        func()
+        count += 1
+
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Password hashing speed')
+    parser.add_argument('--duration', type=float, default=2.0)
+    args = parser.parse_args()
+
+    for scheme, rounds in CONFIGURATIONS:
+        context = create_password_context([scheme], {scheme: rounds})
+        hashed = context.hash('benchmark')
+
+        hashes = measure(lambda: context.hash('benchmark'), args.duration)
+        verifies = measure(
+            lambda: context.verify('benchmark', hashed), args.duration
+        )
+
+        print(
+            f'{scheme:<8} rounds={rounds:<3} '
+            f'{hashes:8.1f} hashes/s {verifies:8.1f} verifies/s'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import tempfile
+import time
+
+from benchmarks.common import api_client
+
+
+def todo(number: int):
+    return {'title': f'todo {number}', 'description': '-', 'state': 'todo'}
+
+
+def single_items(client, count: int):
+    for number in range(count):
+        client.post('/todos/', json=todo(number))
+
+
+def bulk(client, count: int, batch: int):
+    for start in range(0, count, batch):
+        end = min(start + batch, count)
+        client.post('/todos/bulk', json=[todo(n) for n in range(start, end)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Todo write throughput')
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    runs = {
+        'single': lambda client: single_items(client, args.count),
+        'bulk': lambda client: bulk(client, args.count, args.batch),
+    }
+
+    for name, run in runs.items():
+        with tempfile.TemporaryDirectory() as directory:
+            with api_client(directory) as client:
+                start = time.perf_counter()
+                run(client)
+                elapsed = time.perf_counter() - start
+
+        print(f'{name:<6} {args.count / elapsed:10.1f} todos/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import tempfile
+import time
+
+from benchmarks.common import api_client
+
+
+def ndjson(count: int):
+    for number in range(count):
+        yield (
+            f'{{"title": "todo {number}", "description": "-", '
+            f'"state": "todo"}}\n'
+        ).encode()
+
+
+def csv(count: int):
+    yield b'title,description,state\n'
+
+    for number in range(count):
+        yield f'todo {number},-,todo\n'.encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Todo import throughput')
+    parser.add_argument('--count', type=int, default=50_000)
+    args = parser.parse_args()
+
+    for name, body in (('ndjson', ndjson), ('csv', csv)):
+        with tempfile.TemporaryDirectory() as directory:
+            with api_client(directory) as client:
+                start = time.perf_counter()
+                response = client.post(
+                    f'/todos/import?format={name}', content=body(args.count)
+                )
+                elapsed = time.perf_counter() - start
+
+        assert response.json()['imported'] == args.count
+        print(f'{name:<6} {args.count / elapsed:10.1f} todos/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from fast_zero.models import Base, Todo, TodoState, User
+from fast_zero.search import search_like, search_sqlite
+
+WORDS = (
+    'buy milk walk dog call mom pay rent book flight fix bug write report '
+    'review code clean house water plants renew passport plan trip'
+).split()
+
+
+def sentence(size: int):
+    return ' '.join(random.choices(WORDS, k=size))
+
+
+def seed(engine, size: int):
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User), [{'username': 'a', 'email': 'a', 'password': 'a'}]
+        )
+        for start in range(0, size, 10_000):
+            connection.execute(
+                insert(Todo),
+                [
+                    {
+                        'title': sentence(4),
+                        'description': sentence(12),
+                        'state': TodoState.todo,
+                        'user_id': 1,
+                    }
+                    for _ in range(min(10_000, size - start))
+                ],
+            )
+
+        connection.execute(
+            insert(Todo),
+            [
+                {
+                    'title': 'file quarterly taxes',
+                    'description': 'send receipts to the accountant',
+                    'state': TodoState.todo,
+                    'user_id': 1,
+                }
+                for _ in range(10)
+            ],
+        )
+
+
+def measure(session: Session, search, terms: dict[str, str], repeat: int):
+    query, _ = search(select(Todo).where(Todo.user_id == 1), terms)
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        session.scalars(query.limit(100)).all()
+
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Todo text search latency')
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    terms = {'title': 'taxes', 'description': 'accountant'}
+
+    for size in map(int, args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f'sqlite:///{Path(directory) / "b.db"}')
+            Base.metadata.create_all(engine)
+            seed(engine, size)
+
+            with Session(engine) as session:
+                like = measure(session, search_like, terms, args.repeat)
+                fts = measure(session, search_sqlite, terms, args.repeat)
+
+            engine.dispose()
+
+        print(f'{size:>9} todos  like={like:8.2f}ms  fts5={fts:8.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jose import jwt
+
+from fast_zero.tokens import TokenVerifier
+
+
+def pem_pair(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+def keys():
+    yield 'HS256', 'secret', 'secret'
+    yield 'RS256', *pem_pair(rsa.generate_private_key(65537, 2048))
+    yield 'EdDSA', *pem_pair(ed25519.Ed25519PrivateKey.generate())
+
+
+def rate(verify, token: str, count: int):
+    start = time.perf_counter()
+
+    for _ in range(count):
+        verify(token)
+
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JWT verification rate')
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+    claims = {'sub': 'benchmark@example.com', 'exp': 4102444800}
+
+    for algorithm, private_key, public_key in keys():
+        uncached = TokenVerifier(
+            algorithm, verification_key=public_key, maxsize=0
+        )
+        cached = TokenVerifier(algorithm, verification_key=public_key)
+        token = TokenVerifier(algorithm, signing_key=private_key).encode(
+            claims
+        )
+        runs = {
+            'jose': lambda token: jwt.decode(
+                token, public_key, algorithms=[algorithm]
+            ),
+            'prebuilt': uncached.decode,
+            'cached': cached.decode,
+        }
+
+        for name, verify in runs.items():
+            per_second = rate(verify, token, args.count)
+            print(f'{algorithm:<6} {name:<9} {per_second:12.1f} verify/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+from fast_zero.models import Base, User
+
+SEED_USERS = (
+    'WITH RECURSIVE seq(n) AS '
+    '(SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :users) '
+    'INSERT INTO users (username, email, password) '
+    "SELECT 'user' || n, 'user' || n || '@example.com', '-' FROM seq"
+)
+
+
+def lookup_latency(engine, users: int, lookups: int):
+    emails = [
+        f'User{random.randint(1, users)}@Example.com' for _ in range(lookups)
+    ]
+
+    with Session(engine) as session:
+        start = time.perf_counter()
+
+        for email in emails:
+            query = select(User).where(func.lower(User.email) == email.lower())
+            assert session.scalar(query) is not None
+            session.expunge_all()
+
+        return (time.perf_counter() - start) / lookups * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='User lookup latency')
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f'sqlite:///{Path(directory) / "b.db"}')
+        Base.metadata.create_all(engine)
+
+        with engine.begin() as connection:
+            connection.execute(text(SEED_USERS), {'users': args.users})
+
+        indexed = lookup_latency(engine, args.users, args.lookups)
+
+        with engine.begin() as connection:
+            connection.execute(text('DROP INDEX ix_users_email_lower'))
+
+        scanned = lookup_latency(
+            engine, args.users, max(args.lookups // 20, 1)
+        )
+        engine.dispose()
+
+    print(f'indexed  {indexed:10.3f}ms per lookup')
+    print(f'scan     {scanned:10.3f}ms per lookup')
+
+
+if __name__ == '__main__':
+    main()
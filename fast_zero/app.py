@@ -1,8 +1,75 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from fast_zero.database import (
+    check_replicas_periodically,
+    get_engine,
+    get_replica_set,
+)
+from fast_zero.instrumentation import MetricsMiddleware, QueryStatsMiddleware
+from fast_zero.metrics import (
+    clear_snapshots,
+    flush_metrics_periodically,
+    render_metrics,
+    write_snapshot,
+)
+from fast_zero.responses import FastJSONResponse
 from fast_zero.routes import auth, todos, users
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+
+async def cancel(task: asyncio.Task):
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    flusher = checker = None
+    replicas = get_replica_set()
+
+    if settings.METRICS_DIR is not None:
+        clear_snapshots(settings.METRICS_DIR)
+        flusher = asyncio.create_task(
+            flush_metrics_periodically(
+                settings.METRICS_DIR, settings.METRICS_FLUSH_SECONDS
+            )
+        )
+
+    if replicas.engines:
+        checker = asyncio.create_task(
+            check_replicas_periodically(
+                replicas, settings.DATABASE_REPLICA_CHECK_SECONDS
+            )
+        )
 
-app = FastAPI()
+    yield
+
+    if flusher is not None:
+        await cancel(flusher)
+        write_snapshot(settings.METRICS_DIR, final=True)
+
+    if checker is not None:
+        await cancel(checker)
+
+    await replicas.dispose()
+    await get_engine().dispose()
+
+
+app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=(
+        FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
+    ),
+)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(users.router)
 app.include_router(auth.router)
@@ -12,3 +79,14 @@ app.include_router(todos.router)
 @app.get('/', status_code=status.HTTP_200_OK)
 def read_root():
     return {'message': 'Olá Mundo!'}
+
+
+@app.get('/metrics', include_in_schema=False)
+async def read_metrics():
+    return PlainTextResponse(
+        render_metrics(
+            settings.METRICS_DIR,
+            stale_after=settings.METRICS_FLUSH_SECONDS * 3,
+        ),
+        media_type='text/plain; version=0.0.4',
+    )
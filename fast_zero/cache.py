@@ -0,0 +1,224 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from fast_zero.settings import Settings
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+
+            if item is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = item
+
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        if ttl is None:
+            ttl = self.ttl
+
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+
+        return default if item is None else item[0]
+
+    def discard_where(self, predicate):
+        with self._lock:
+            keys = [
+                key
+                for key, (value, _) in self._data.items()
+                if predicate(key, value)
+            ]
+            for key in keys:
+                del self._data[key]
+
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
+
+
+class ResponseCache(ABC):
+    @abstractmethod
+    def get(self, namespace, key) -> bytes | None:
+        ...
+
+    @abstractmethod
+    def set(self, namespace, key, value: bytes):
+        ...
+
+    @abstractmethod
+    def invalidate(self, namespace):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class NullResponseCache(ResponseCache):
+    def get(self, namespace, key):
+        return None
+
+    def set(self, namespace, key, value: bytes):
+        pass
+
+    def invalidate(self, namespace):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+class MemoryResponseCache(ResponseCache):
+    def __init__(self, maxsize: int, max_bytes: int, ttl: float):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._data = OrderedDict()
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, item_key):
+        value, _ = self._data.pop(item_key)
+        self.bytes -= len(value)
+        namespace, key = item_key
+        keys = self._namespaces[namespace]
+        keys.discard(key)
+
+        if not keys:
+            del self._namespaces[namespace]
+
+    def get(self, namespace, key):
+        item_key = (namespace, key)
+
+        with self._lock:
+            item = self._data.get(item_key)
+
+            if item is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = item
+
+            if expires_at <= time.monotonic():
+                self._remove(item_key)
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(item_key)
+            self.hits += 1
+            return value
+
+    def set(self, namespace, key, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+
+        item_key = (namespace, key)
+
+        with self._lock:
+            if item_key in self._data:
+                self._remove(item_key)
+
+            self._data[item_key] = (value, time.monotonic() + self.ttl)
+            self._namespaces.setdefault(namespace, set()).add(key)
+            self.bytes += len(value)
+
+            while (
+                len(self._data) > self.maxsize or self.bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def invalidate(self, namespace):
+        with self._lock:
+            for key in list(self._namespaces.get(namespace, ())):
+                self._remove((namespace, key))
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._namespaces.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'size': len(self._data),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+
+RESPONSE_CACHE_BACKENDS = {
+    'memory': lambda settings: MemoryResponseCache(
+        maxsize=settings.RESPONSE_CACHE_MAXSIZE,
+        max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+        ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    ),
+    'none': lambda settings: NullResponseCache(),
+}
+
+
+def create_response_cache(settings: Settings):
+    return RESPONSE_CACHE_BACKENDS[settings.RESPONSE_CACHE_BACKEND](settings)
@@ -1,11 +1,253 @@
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import threading
+import time
+from functools import lru_cache, partial
+
+from fastapi import Request
+from sqlalchemy import event, select
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from fast_zero.cache import TTLCache
+from fast_zero.instrumentation import instrument_engine
+from fast_zero.metrics import CallbackFamily
+from fast_zero.models import User
+from fast_zero.settings import Settings, get_settings
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, elapsed: float):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds += elapsed
+            self.max_checkout_seconds = max(self.max_checkout_seconds, elapsed)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def connect(self):
+        start = time.perf_counter()
+
+        try:
+            connection = super().connect()
+        except TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+
+        pool_metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+def on_connect(dbapi_connection, connection_record):
+    pool_metrics.record_connect()
+
+
+def on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.record_invalidation()
+
+
+def create_engine(settings: Settings, url: str | None = None):
+    engine = create_async_engine(
+        url or settings.DATABASE_URL,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    )
+    event.listen(engine.sync_engine, 'connect', on_connect)
+    event.listen(engine.sync_engine, 'invalidate', on_invalidate)
+    instrument_engine(engine)
+
+    return engine
+
+
+@lru_cache
+def get_engine():
+    return create_engine(get_settings())
+
+
+def pool_stats(pool=None):
+    pool = pool or get_engine().pool
+
+    return {
+        'size': pool.size(),
+        'in_use': pool.checkedout(),
+        'idle': pool.checkedin(),
+        'overflow': pool.overflow(),
+        'checkouts': pool_metrics.checkouts,
+        'checkout_seconds': pool_metrics.checkout_seconds,
+        'max_checkout_seconds': pool_metrics.max_checkout_seconds,
+        'timeouts': pool_metrics.timeouts,
+        'connects': pool_metrics.connects,
+        'invalidations': pool_metrics.invalidations,
+    }
+
+
+CallbackFamily(
+    'db_pool',
+    'Connection pool state and checkout statistics.',
+    ('stat',),
+    collect=lambda: [((stat,), value) for stat, value in pool_stats().items()],
+)
+
+
+class ReplicaSet:
+    def __init__(
+        self,
+        engines,
+        check_seconds: float = 10,
+        sticky_seconds: float = 5,
+        sticky_maxsize: int = 10_000,
+    ):
+        self.engines = list(engines)
+        self.check_seconds = check_seconds
+        self.down_until = [0.0] * len(self.engines)
+        self.selected = [0] * len(self.engines)
+        self.recent_writes = TTLCache(sticky_maxsize, ttl=sticky_seconds)
+        self._next = itertools.count()
+
+        for index, engine in enumerate(self.engines):
+            event.listen(
+                engine.sync_engine,
+                'handle_error',
+                partial(self.on_error, index),
+            )
+
+    def choose(self):
+        now = time.monotonic()
+
+        for _ in self.engines:
+            index = next(self._next) % len(self.engines)
+
+            if self.down_until[index] <= now:
+                self.selected[index] += 1
+                return self.engines[index]
+
+        return None
+
+    def mark_down(self, index: int):
+        self.down_until[index] = time.monotonic() + self.check_seconds
+
+    def on_error(self, index: int, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(index)
+
+    async def ping(self, engine):
+        async with engine.connect() as connection:
+            await connection.execute(select(User.id).limit(1))
+
+    async def check(self):
+        for index, engine in enumerate(self.engines):
+            try:
+                await asyncio.wait_for(self.ping(engine), self.check_seconds)
+            except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+                self.mark_down(index)
+            else:
+                self.down_until[index] = 0.0
+
+    def mark_written(self, subject: str):
+        if self.engines:
+            self.recent_writes.set(subject, True)
+
+    def is_sticky(self, subject: str | None):
+        return subject is not None and self.recent_writes.get(subject, False)
+
+    def stats(self):
+        now = time.monotonic()
+
+        for index, down_until in enumerate(self.down_until):
+            yield (str(index), 'healthy'), int(down_until <= now)
+            yield (str(index), 'selected'), self.selected[index]
+
+    async def dispose(self):
+        for engine in self.engines:
+            await engine.dispose()
+
+
+@lru_cache
+def get_replica_set():
+    settings = get_settings()
+
+    return ReplicaSet(
+        [
+            create_engine(settings, url)
+            for url in settings.DATABASE_REPLICA_URLS
+        ],
+        check_seconds=settings.DATABASE_REPLICA_CHECK_SECONDS,
+        sticky_seconds=settings.DATABASE_REPLICA_STICKY_SECONDS,
+        sticky_maxsize=settings.DATABASE_REPLICA_STICKY_MAXSIZE,
+    )
+
+
+async def check_replicas_periodically(replicas: ReplicaSet, interval: float):
+    while True:
+        await replicas.check()
+        await asyncio.sleep(interval)
+
+
+CallbackFamily(
+    'db_replicas',
+    'Read replica health (1 healthy, 0 down) and times selected for reads.',
+    ('replica', 'stat'),
+    collect=lambda: get_replica_set().stats(),
+)
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self.info['wrote'] = True
+        elif self.info.get('replica') is not None:
+            if not get_replica_set().is_sticky(self.info.get('subject')):
+                return self.info['replica'].sync_engine
+
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def remember_writes(session):
+    if session.info.pop('wrote', False) and 'subject' in session.info:
+        get_replica_set().mark_written(session.info['subject'])
+
 
-from fast_zero.settings import Settings
+READ_METHODS = {'GET', 'HEAD'}
 
-engine = create_engine(Settings().DATABASE_URL)
 
+async def get_session(request: Request):
+    async with AsyncSession(
+        get_engine(),
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+    ) as session:
+        if request.method in READ_METHODS:
+            session.info['replica'] = get_replica_set().choose()
 
-def get_session():
-    with Session(engine) as session:
         yield session
@@ -0,0 +1,72 @@
+from hashlib import blake2b
+
+from fastapi import Request, Response, status
+from sqlalchemy import select, update
+
+from fast_zero.instrumentation import route_labels
+from fast_zero.metrics import CounterFamily
+from fast_zero.models import Counter, User
+
+etag_responses = CounterFamily(
+    'http_etag_responses_total',
+    'ETag-validated reads by route and outcome (not_modified or modified).',
+    ('method', 'route', 'outcome'),
+)
+
+
+def make_etag(*parts):
+    digest = blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str):
+    header = request.headers.get('if-none-match')
+
+    if header is None:
+        return False
+
+    tags = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return '*' in tags or etag in tags
+
+
+def not_modified(request: Request, etag: str):
+    labels = route_labels(request.scope)
+
+    if etag_matches(request, etag):
+        etag_responses.inc((*labels, 'not_modified'))
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+        )
+
+    etag_responses.inc((*labels, 'modified'))
+    return None
+
+
+async def todos_version(session, user_id: int):
+    return await session.scalar(
+        select(User.todos_version).where(User.id == user_id)
+    )
+
+
+def bump_todos_version(user_id: int):
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(todos_version=User.todos_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def counter_version(session, name: str):
+    return await session.scalar(
+        select(Counter.value).where(Counter.name == name)
+    )
+
+
+def bump_counter(name: str):
+    return (
+        update(Counter)
+        .where(Counter.name == name)
+        .values(value=Counter.value + 1)
+        .execution_options(synchronize_session=False)
+    )
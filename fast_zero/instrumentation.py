@@ -0,0 +1,161 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from fast_zero.metrics import CounterFamily, HistogramFamily
+from fast_zero.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+ROUTE_LABELS = ('method', 'route')
+
+http_requests = CounterFamily(
+    'http_requests_total',
+    'HTTP requests by route template and status code.',
+    (*ROUTE_LABELS, 'status'),
+)
+http_request_seconds = HistogramFamily(
+    'http_request_duration_seconds',
+    'HTTP request latency by route template.',
+    ROUTE_LABELS,
+    buckets=SECONDS_BUCKETS,
+)
+route_query_count = HistogramFamily(
+    'db_queries_per_request',
+    'SQL statements executed per request.',
+    ROUTE_LABELS,
+    buckets=QUERY_COUNT_BUCKETS,
+)
+route_db_seconds = HistogramFamily(
+    'db_seconds_per_request',
+    'Time spent in SQL statements per request.',
+    ROUTE_LABELS,
+    buckets=SECONDS_BUCKETS,
+)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.seconds += elapsed
+
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.seconds * 1000:.3f}, '
+            f'db-queries;desc={self.count}, '
+            f'db-slowest;dur={self.slowest_seconds * 1000:.3f}'
+        )
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    'current_query_stats', default=None
+)
+
+
+def before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    context.query_start = time.perf_counter()
+
+
+def after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    elapsed = time.perf_counter() - context.query_start
+    stats = current_query_stats.get()
+
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def instrument_engine(engine):
+    sync_engine = getattr(engine, 'sync_engine', engine)
+    event.listen(sync_engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def route_labels(scope):
+    route = scope.get('route')
+    return scope['method'], route.path if route else '<unmatched>'
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            labels = route_labels(scope)
+            http_requests.inc(labels + (status_code,))
+            http_request_seconds.observe(labels, time.perf_counter() - start)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_server_timing(message):
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', stats.server_timing())
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            current_query_stats.reset(token)
+            self.observe(route_labels(scope), stats)
+
+    @staticmethod
+    def observe(labels, stats: QueryStats):
+        route_query_count.observe(labels, stats.count)
+        route_db_seconds.observe(labels, stats.seconds)
+
+        if stats.slowest_seconds * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(
+                'Slow query on %s %s (%.1fms): %s',
+                *labels,
+                stats.slowest_seconds * 1000,
+                stats.slowest_statement,
+            )
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+
+class Registry:
+    def __init__(self):
+        self.families = {}
+
+    def register(self, family):
+        self.families[family.name] = family
+
+    def collect(self):
+        return {
+            name: {'type': family.type, 'samples': family.samples()}
+            for name, family in self.families.items()
+        }
+
+    def render(self, snapshot=None):
+        snapshot = snapshot or self.collect()
+        lines = []
+
+        for name, family in self.families.items():
+            samples = snapshot.get(name, {'samples': []})['samples']
+            lines.append(f'# HELP {name} {family.documentation}')
+            lines.append(f'# TYPE {name} {family.type}')
+            lines.extend(family.render(samples))
+
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+
+    if not pairs:
+        return ''
+
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{n}="{v}"' for n, v in escaped) + '}'
+
+
+class MetricFamily:
+    type = 'untyped'
+
+    def __init__(self, name, documentation, label_names=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        registry.register(self)
+
+
+class CounterFamily(MetricFamily):
+    type = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values = {}
+
+    def inc(self, labels=(), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        return [[list(labels), value] for labels, value in self.values.items()]
+
+    def render(self, samples):
+        for labels, value in samples:
+            yield f'{self.name}{format_labels(self.label_names, labels)} {value}'
+
+
+class CallbackFamily(MetricFamily):
+    def __init__(self, *args, collect, type='gauge', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.type = type
+        self.collect = collect
+
+    def samples(self):
+        return [[list(labels), value] for labels, value in self.collect()]
+
+    render = CounterFamily.render
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily(MetricFamily):
+    type = 'histogram'
+
+    def __init__(self, *args, buckets, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        histogram = self.histograms.get(values)
+
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(
+                    values, Histogram(self.buckets)
+                )
+
+        return histogram
+
+    def observe(self, labels, value: float):
+        histogram = self.histograms.get(labels) or self.labels(*labels)
+        histogram.observe(value)
+
+    def samples(self):
+        return [
+            [list(labels), list(histogram.counts), histogram.sum]
+            for labels, histogram in self.histograms.items()
+        ]
+
+    def render(self, samples):
+        bounds = [*map(str, self.buckets), '+Inf']
+
+        for labels, counts, total in samples:
+            cumulative = 0
+
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                label_text = format_labels(
+                    self.label_names, labels, [('le', bound)]
+                )
+                yield f'{self.name}_bucket{label_text} {cumulative}'
+
+            label_text = format_labels(self.label_names, labels)
+            yield f'{self.name}_sum{label_text} {total}'
+            yield f'{self.name}_count{label_text} {cumulative}'
+
+
+def merge_snapshots(snapshots):
+    merged = {}
+
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            samples = merged.setdefault(
+                name, {'type': family['type'], 'samples': {}}
+            )['samples']
+
+            for labels, *values in family['samples']:
+                key = tuple(labels)
+                current = samples.get(key)
+
+                if current is None:
+                    samples[key] = values
+                elif family['type'] == 'histogram':
+                    counts, total = values
+                    current[0] = [a + b for a, b in zip(current[0], counts)]
+                    current[1] += total
+                else:
+                    current[0] += values[0]
+
+    return {
+        name: {
+            'type': family['type'],
+            'samples': [
+                [list(labels), *values]
+                for labels, values in family['samples'].items()
+            ],
+        }
+        for name, family in merged.items()
+    }
+
+
+def cumulative_families(snapshot):
+    return {
+        name: family
+        for name, family in snapshot.items()
+        if family['type'] != 'gauge'
+    }
+
+
+def write_snapshot(directory: str, registry=REGISTRY, final: bool = False):
+    snapshot = registry.collect()
+
+    if final:
+        snapshot = cumulative_families(snapshot)
+
+    path = Path(directory) / f'metrics-{os.getpid()}.json'
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(snapshot))
+    os.replace(temporary, path)
+
+
+def clear_snapshots(directory: str):
+    for path in Path(directory).glob('metrics-*.json'):
+        path.unlink(missing_ok=True)
+
+
+def read_snapshots(directory: str, stale_after: float | None = None):
+    snapshots = []
+
+    for path in Path(directory).glob('metrics-*.json'):
+        try:
+            snapshot = json.loads(path.read_text())
+            stale = (
+                stale_after is not None
+                and time.time() - path.stat().st_mtime > stale_after
+            )
+        except (OSError, ValueError):
+            continue
+
+        snapshots.append(cumulative_families(snapshot) if stale else snapshot)
+
+    return snapshots
+
+
+def render_metrics(
+    directory: str | None = None,
+    registry=REGISTRY,
+    stale_after: float | None = None,
+):
+    if directory is None:
+        return registry.render()
+
+    write_snapshot(directory, registry)
+    snapshots = read_snapshots(directory, stale_after)
+    return registry.render(merge_snapshots(snapshots))
+
+
+async def flush_metrics_periodically(directory: str, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        write_snapshot(directory)
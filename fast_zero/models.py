@@ -1,6 +1,6 @@
 from enum import Enum
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import DDL, ForeignKey, Index, event, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -23,14 +23,37 @@ class User(Base):
     username: Mapped[str]
     password: Mapped[str]
     email: Mapped[str]
+    todos_version: Mapped[int] = mapped_column(default=0, server_default='0')
 
     todos: Mapped[list['Todo']] = relationship(
         back_populates='user', cascade='all, delete-orphan'
     )
 
 
+Index('ix_users_email_lower', func.lower(User.email), unique=True)
+Index('ix_users_username_lower', func.lower(User.username), unique=True)
+
+
+class Counter(Base):
+    __tablename__ = 'counters'
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[int] = mapped_column(default=0, server_default='0')
+
+
+event.listen(
+    Counter.__table__,
+    'after_create',
+    DDL("INSERT INTO counters (name) VALUES ('users')"),
+)
+
+
 class Todo(Base):
     __tablename__ = 'todos'
+    __table_args__ = (
+        Index('ix_todos_user_id_id', 'user_id', 'id'),
+        Index('ix_todos_user_id_state', 'user_id', 'state'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str]
@@ -39,3 +62,44 @@ class Todo(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
 
     user: Mapped[User] = relationship(back_populates='todos')
+
+
+TODO_SEARCH_DDL = {
+    'sqlite': [
+        'CREATE VIRTUAL TABLE todos_fts USING fts5('
+        "title, description, content='todos', content_rowid='id', "
+        "tokenize='trigram')",
+        'CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN '
+        'INSERT INTO todos_fts(rowid, title, description) '
+        'VALUES (new.id, new.title, new.description); END',
+        'CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN '
+        'INSERT INTO todos_fts(todos_fts, rowid, title, description) '
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        'CREATE TRIGGER todos_fts_update '
+        'AFTER UPDATE OF title, description ON todos BEGIN '
+        'INSERT INTO todos_fts(todos_fts, rowid, title, description) '
+        "VALUES ('delete', old.id, old.title, old.description); "
+        'INSERT INTO todos_fts(rowid, title, description) '
+        'VALUES (new.id, new.title, new.description); END',
+    ],
+    'postgresql': [
+        'CREATE INDEX ix_todos_title_search ON todos '
+        "USING GIN (to_tsvector('simple', title))",
+        'CREATE INDEX ix_todos_description_search ON todos '
+        "USING GIN (to_tsvector('simple', description))",
+    ],
+}
+
+for dialect, statements in TODO_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(
+            Todo.__table__,
+            'after_create',
+            DDL(statement).execute_if(dialect=dialect),
+        )
+
+event.listen(
+    Todo.__table__,
+    'before_drop',
+    DDL('DROP TABLE IF EXISTS todos_fts').execute_if(dialect='sqlite'),
+)
@@ -0,0 +1,205 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from fastapi import Depends, HTTPException, Request, status
+
+from fast_zero.metrics import CallbackFamily, CounterFamily
+from fast_zero.models import User
+from fast_zero.security import get_current_user
+from fast_zero.settings import Settings, get_settings
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+rate_limited = CounterFamily(
+    'http_rate_limited_total',
+    'Requests rejected with 429 Too Many Requests by rate limit scope.',
+    ('scope',),
+)
+
+
+def parse_rate(rate: str):
+    count, _, period = rate.partition('/')
+    seconds = PERIODS[period] if period in PERIODS else float(period)
+
+    if int(count) < 1 or seconds <= 0:
+        raise ValueError(f'Invalid rate limit: {rate!r}')
+
+    return int(count), float(seconds)
+
+
+def token_bucket(state, now: float, limit: int, period: float):
+    tokens, updated = state or (limit, now)
+    tokens = min(limit, tokens + (now - updated) * limit / period)
+
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+
+    return (tokens, now), (1 - tokens) * period / limit
+
+
+def sliding_window(state, now: float, limit: int, period: float):
+    start, previous, current = state or (now, 0, 0)
+    windows = int((now - start) // period)
+
+    if windows:
+        previous = current if windows == 1 else 0
+        current = 0
+        start += windows * period
+
+    elapsed = now - start
+
+    if previous * (period - elapsed) / period + current + 1 <= limit:
+        return (start, previous, current + 1), 0.0
+
+    if current < limit:
+        wait = period - elapsed - (limit - current - 1) * period / previous
+    else:
+        wait = period - elapsed + period * (1 - (limit - 1) / current)
+
+    return (start, previous, current), max(wait, 0.0)
+
+
+STRATEGIES = {'token_bucket': token_bucket, 'sliding_window': sliding_window}
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    def hit(self, key, limit: int, period: float) -> float:
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class NullRateLimitBackend(RateLimitBackend):
+    def hit(self, key, limit: int, period: float):
+        return 0.0
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    def __init__(self, maxsize: int, strategy: str = 'token_bucket'):
+        self.maxsize = maxsize
+        self.strategy = STRATEGIES[strategy]
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit: int, period: float):
+        now = time.monotonic()
+
+        with self._lock:
+            state, retry_after = self.strategy(
+                self._data.get(key), now, limit, period
+            )
+            self._data[key] = state
+            self._data.move_to_end(key)
+
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+            if retry_after:
+                self.rejected += 1
+            else:
+                self.allowed += 1
+
+        return retry_after
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+            'evictions': self.evictions,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
+
+
+RATE_LIMIT_BACKENDS = {
+    'memory': lambda settings: MemoryRateLimitBackend(
+        maxsize=settings.RATE_LIMIT_MAXSIZE,
+        strategy=settings.RATE_LIMIT_STRATEGY,
+    ),
+    'none': lambda settings: NullRateLimitBackend(),
+}
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, limits: dict):
+        self.backend = backend
+        self.limits = limits
+
+    def check(self, scope: str, key):
+        limit, period = self.limits[scope]
+        retry_after = self.backend.hit((scope, key), limit, period)
+
+        if retry_after:
+            rate_limited.inc((scope,))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail='Too many requests',
+                headers={'Retry-After': str(math.ceil(retry_after))},
+            )
+
+
+def create_rate_limiter(settings: Settings):
+    backend = RATE_LIMIT_BACKENDS[settings.RATE_LIMIT_BACKEND](settings)
+
+    return RateLimiter(
+        backend,
+        {
+            'auth': parse_rate(settings.RATE_LIMIT_AUTH),
+            'users': parse_rate(settings.RATE_LIMIT_USERS),
+            'todos': parse_rate(settings.RATE_LIMIT_TODOS),
+        },
+    )
+
+
+rate_limiter = create_rate_limiter(get_settings())
+
+CallbackFamily(
+    'rate_limiter',
+    'Rate limiter store: allowed, rejected, evictions, size and maxsize.',
+    ('stat',),
+    collect=lambda: [
+        ((k,), v) for k, v in rate_limiter.backend.stats().items()
+    ],
+)
+
+
+def client_address(request: Request):
+    return request.client.host if request.client else 'unknown'
+
+
+def limit_by_ip(scope: str):
+    async def check_rate_limit(request: Request):
+        rate_limiter.check(scope, client_address(request))
+
+    return Depends(check_rate_limit)
+
+
+def limit_by_user(scope: str):
+    async def check_rate_limit(user: User = Depends(get_current_user)):
+        rate_limiter.check(scope, user.id)
+
+    return Depends(check_rate_limit)
@@ -0,0 +1,14 @@
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        if orjson is None:  # pragma: no cover
+            return super().render(content)
+
+        return orjson.dumps(content)
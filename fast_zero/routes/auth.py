@@ -1,31 +1,42 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero.database import get_session
 from fast_zero.models import User
+from fast_zero.ratelimit import limit_by_ip, limit_by_user
 from fast_zero.schemas import Token
 from fast_zero.security import (
     create_access_token,
     get_current_user,
+    password_needs_update,
+    rehash_password,
+    run_password_task,
     verify_password,
 )
 
 router = APIRouter(prefix='/auth', tags=['Auth'])
 
 OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
-Session = Annotated[Session, Depends(get_session)]
+Session = Annotated[AsyncSession, Depends(get_session)]
 
 
-@router.post('/token', response_model=Token)
-def login_for_access_token(
+@router.post(
+    '/token', response_model=Token, dependencies=[limit_by_ip('auth')]
+)
+async def login_for_access_token(
     form_data: OAuth2Form,
     session: Session,
+    background_tasks: BackgroundTasks,
 ):
-    user = session.scalar(select(User).where(User.email == form_data.username))
+    user = await session.scalar(
+        select(User).where(
+            func.lower(User.email) == func.lower(form_data.username)
+        )
+    )
 
     if not user:
         raise HTTPException(
@@ -33,18 +44,33 @@ def login_for_access_token(
             detail='Incorrect email or password',
         )
 
-    if not verify_password(form_data.password, user.password):
+    if not await run_password_task(
+        verify_password, form_data.password, user.password
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Incorrect email or password',
         )
 
+    if password_needs_update(user.password):
+        background_tasks.add_task(
+            rehash_password,
+            session,
+            user.id,
+            user.password,
+            form_data.password,
+        )
+
     access_token = create_access_token(data={'sub': user.email})
     return {'access_token': access_token, 'token_type': 'bearer'}
 
 
-@router.post('/refresh_token', response_model=Token)
-def refresh_access_token(
+@router.post(
+    '/refresh_token',
+    response_model=Token,
+    dependencies=[limit_by_user('auth')],
+)
+async def refresh_access_token(
     user: User = Depends(get_current_user),
 ):
     new_access_token = create_access_token(data={'sub': user.email})
@@ -1,98 +1,454 @@
-from typing import Annotated
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.cache import create_response_cache
 from fast_zero.database import get_session
-from fast_zero.models import Todo, User
+from fast_zero.etags import (
+    bump_todos_version,
+    make_etag,
+    not_modified,
+    todos_version,
+)
+from fast_zero.metrics import CallbackFamily
+from fast_zero.models import Todo, TodoState, User
+from fast_zero.ratelimit import limit_by_user
 from fast_zero.schemas import (
     ListTodos,
     Message,
+    TodoBulkResults,
+    TodoBulkUpdate,
+    TodoImportResults,
     TodoPublic,
     TodoSchema,
+    TodoStats,
     TodoUpdate,
 )
+from fast_zero.search import search_todos
 from fast_zero.security import get_current_user
+from fast_zero.settings import get_settings
+from fast_zero.singleflight import SingleFlight
+from fast_zero.streaming import (
+    csv_chunks,
+    csv_records,
+    ndjson_chunks,
+    ndjson_records,
+    text_lines,
+)
+
+settings = get_settings()
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
-Session = Annotated[Session, Depends(get_session)]
+Session = Annotated[AsyncSession, Depends(get_session)]
+
+router = APIRouter(
+    prefix='/todos', tags=['todos'], dependencies=[limit_by_user('todos')]
+)
+
+TODO_PUBLIC_COLUMNS = [
+    getattr(Todo, field) for field in TodoPublic.model_fields
+]
+
+BulkItems = Body(min_length=1, max_length=settings.TODO_BULK_MAX_ITEMS)
+
+response_cache = create_response_cache(settings)
+
+CallbackFamily(
+    'todo_response_cache',
+    'Cached list_todos responses: hits, misses, evictions, size and bytes.',
+    ('stat',),
+    collect=lambda: [((k,), v) for k, v in response_cache.stats().items()],
+)
+
+list_flights = SingleFlight()
+
+CallbackFamily(
+    'todo_list_singleflight',
+    'Concurrent identical list_todos reads: executions, coalesced, in_flight.',
+    ('stat',),
+    collect=lambda: [((k,), v) for k, v in list_flights.stats().items()],
+)
+
+
+async def commit_changes(session: AsyncSession, user_id: int, changed=True):
+    if changed:
+        await session.execute(bump_todos_version(user_id))
+
+    await session.commit()
+
+    if changed:
+        response_cache.invalidate(user_id)
+
+
+def encode_cursor(todo_id: int):
+    return urlsafe_b64encode(str(todo_id).encode()).decode()
+
+
+def column_changes(todo: TodoUpdate):
+    values = todo.model_dump(exclude_unset=True, exclude={'id'})
+    return {k: v for k, v in values.items() if k in Todo.__table__.c}
+
+
+def validation_detail(error: ValidationError):
+    messages = []
+
+    for e in error.errors():
+        location = '.'.join(map(str, e['loc']))
+        messages.append(f'{location}: {e["msg"]}' if location else e['msg'])
+
+    return '; '.join(messages)
+
 
-router = APIRouter(prefix='/todos', tags=['todos'])
+MAX_CURSOR = 2**63 - 1
+
+
+def decode_cursor(cursor: str):
+    try:
+        todo_id = int(urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        todo_id = -1
+
+    if not 0 <= todo_id <= MAX_CURSOR:
+        raise HTTPException(status_code=400, detail='Invalid cursor.')
+
+    return todo_id
 
 
 @router.post('/', response_model=TodoPublic)
-def create_todo(todo: TodoSchema, user: CurrentUser, session: Session):
-    db_todo: Todo = Todo(
-        title=todo.title,
-        description=todo.description,
-        state=todo.state,
-        user_id=user.id,
+async def create_todo(todo: TodoSchema, user: CurrentUser, session: Session):
+    db_todo = await session.scalar(
+        insert(Todo)
+        .values(
+            title=todo.title,
+            description=todo.description,
+            state=todo.state,
+            user_id=user.id,
+        )
+        .returning(Todo)
     )
-    session.add(db_todo)
-    session.commit()
-    session.refresh(db_todo)
+    await commit_changes(session, user.id)
 
     return db_todo
 
 
 @router.get('/', response_model=ListTodos)
-def list_todos(
+async def list_todos(
+    request: Request,
     session: Session,
     user: CurrentUser,
     title: str = Query(None),
     description: str = Query(None),
     state: str = Query(None),
     offset: int = Query(None),
-    limit: int = Query(None),
+    limit: int = Query(
+        settings.TODO_PAGE_SIZE, ge=1, le=settings.TODO_MAX_PAGE_SIZE
+    ),
+    cursor: str = Query(None),
 ):
-    query = select(Todo).where(Todo.user_id == user.id)
+    version = await todos_version(session, user.id)
+    params = (title, description, state, offset, limit, cursor)
+    etag = make_etag('todos', user.id, version, params)
+    cached = not_modified(request, etag)
+
+    if cached is not None:
+        return cached
+
+    key = (version, params)
+    body = response_cache.get(user.id, key)
+
+    if body is None:
+        body = await list_flights.run(
+            (user.id, key),
+            lambda: render_todos(
+                session, user, title, description, state, offset, limit, cursor
+            ),
+        )
+        response_cache.set(user.id, key, body)
+
+    return Response(
+        body, media_type='application/json', headers={'ETag': etag}
+    )
 
-    if title:
-        query = query.filter(Todo.title.contains(title))
 
-    if description:
-        query = query.filter(Todo.description.contains(description))
+async def render_todos(
+    session, user, title, description, state, offset, limit, cursor
+):
+    query = select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == user.id)
+
+    query, ranked = search_todos(
+        query, session.bind.dialect.name, title, description
+    )
 
     if state:
         query = query.filter(Todo.state == state)
 
-    todos = session.scalars(query.offset(offset).limit(limit)).all()
+    if cursor:
+        query = query.filter(Todo.id > decode_cursor(cursor))
+
+    todos = [
+        row._asdict()
+        for row in await session.execute(
+            query.order_by(Todo.id).offset(offset).limit(limit + 1)
+        )
+    ]
+
+    next_cursor = None
+    if len(todos) > limit:
+        todos = todos[:limit]
+        if not ranked:
+            next_cursor = encode_cursor(todos[-1]['id'])
+
+    listing = ListTodos(todos=todos, next_cursor=next_cursor)
+    return listing.model_dump_json().encode()
+
+
+@router.get('/stats', response_model=TodoStats)
+async def todo_stats(
+    session: Session,
+    user: CurrentUser,
+    title: str = Query(None),
+    description: str = Query(None),
+):
+    query = select(Todo.state, func.count()).where(Todo.user_id == user.id)
+
+    query, _ = search_todos(
+        query, session.bind.dialect.name, title, description
+    )
+
+    counts = dict(
+        (
+            await session.execute(query.order_by(None).group_by(Todo.state))
+        ).all()
+    )
+    states = {state: counts.get(state, 0) for state in TodoState}
+
+    return {'total': sum(states.values()), 'states': states}
 
-    return {'todos': todos}
+
+@router.get('/export')
+async def export_todos(
+    session: Session,
+    user: CurrentUser,
+    format: Literal['ndjson', 'csv'] = Query('ndjson'),
+):
+    rows = await session.stream(
+        select(*TODO_PUBLIC_COLUMNS)
+        .where(Todo.user_id == user.id)
+        .order_by(Todo.id)
+        .execution_options(yield_per=settings.TODO_EXPORT_CHUNK_SIZE)
+    )
+    headers = {'Content-Disposition': f'attachment; filename="todos.{format}"'}
+
+    if format == 'csv':
+        return StreamingResponse(
+            csv_chunks(rows.partitions(), rows.keys()),
+            media_type='text/csv',
+            headers=headers,
+        )
+
+    return StreamingResponse(
+        ndjson_chunks(rows.partitions()),
+        media_type='application/x-ndjson',
+        headers=headers,
+    )
+
+
+@router.post('/import', response_model=TodoImportResults)
+async def import_todos(
+    request: Request,
+    session: Session,
+    user: CurrentUser,
+    format: Literal['ndjson', 'csv'] = Query('ndjson'),
+):
+    lines = text_lines(request.stream())
+
+    if format == 'csv':
+        records = csv_records(lines, settings.TODO_IMPORT_MAX_RECORD_LINES)
+        validate = TodoSchema.model_validate
+    else:
+        records = ndjson_records(lines)
+        validate = TodoSchema.model_validate_json
+
+    imported = failed = 0
+    errors = []
+    batch = []
+
+    async def flush():
+        nonlocal imported
+        await session.execute(insert(Todo.__table__), batch)
+        await commit_changes(session, user.id)
+        imported += len(batch)
+        batch.clear()
+
+    async for line, record in records:
+        try:
+            todo = validate(record)
+        except ValidationError as error:
+            failed += 1
+            if len(errors) < settings.TODO_IMPORT_MAX_ERRORS:
+                errors.append(
+                    {'line': line, 'detail': validation_detail(error)}
+                )
+            continue
+
+        batch.append({**todo.model_dump(), 'user_id': user.id})
+
+        if len(batch) >= settings.TODO_IMPORT_CHUNK_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    return {'imported': imported, 'failed': failed, 'errors': errors}
+
+
+@router.post('/bulk', response_model=TodoBulkResults)
+async def create_todos(
+    user: CurrentUser,
+    session: Session,
+    todos: Annotated[list[TodoSchema], BulkItems],
+):
+    db_todos = await session.scalars(
+        insert(Todo).returning(Todo, sort_by_parameter_order=True),
+        [{**todo.model_dump(), 'user_id': user.id} for todo in todos],
+    )
+    results = [
+        {'id': db_todo.id, 'status': status.HTTP_201_CREATED, 'todo': db_todo}
+        for db_todo in db_todos
+    ]
+    await commit_changes(session, user.id)
+
+    return {'results': results}
+
+
+@router.patch('/bulk', response_model=TodoBulkResults)
+async def patch_todos(
+    user: CurrentUser,
+    session: Session,
+    todos: Annotated[list[TodoBulkUpdate], BulkItems],
+):
+    ids = [todo.id for todo in todos]
+    owned = set(
+        await session.scalars(
+            select(Todo.id).where(Todo.user_id == user.id, Todo.id.in_(ids))
+        )
+    )
+
+    changes = []
+    for todo in todos:
+        values = column_changes(todo)
+
+        if todo.id in owned and values:
+            changes.append({'id': todo.id, **values})
+
+    if changes:
+        await session.execute(update(Todo), changes)
+
+    db_todos = await session.scalars(
+        select(Todo)
+        .where(Todo.id.in_(owned))
+        .execution_options(populate_existing=True)
+    )
+    updated = {db_todo.id: db_todo for db_todo in db_todos}
+    await commit_changes(session, user.id, bool(changes))
+
+    results = []
+    for todo_id in ids:
+        if todo_id in updated:
+            results.append(
+                {
+                    'id': todo_id,
+                    'status': status.HTTP_200_OK,
+                    'todo': updated[todo_id],
+                }
+            )
+        else:
+            results.append(
+                {'id': todo_id, 'status': status.HTTP_404_NOT_FOUND}
+            )
+
+    return {'results': results}
+
+
+@router.post('/bulk/delete', response_model=TodoBulkResults)
+async def delete_todos(
+    user: CurrentUser,
+    session: Session,
+    ids: Annotated[list[int], BulkItems],
+):
+    deleted = set(
+        await session.scalars(
+            delete(Todo)
+            .where(Todo.user_id == user.id, Todo.id.in_(ids))
+            .returning(Todo.id)
+        )
+    )
+
+    await commit_changes(session, user.id, bool(deleted))
+
+    results = []
+    for todo_id in ids:
+        if todo_id in deleted:
+            results.append({'id': todo_id, 'status': status.HTTP_200_OK})
+        else:
+            results.append(
+                {'id': todo_id, 'status': status.HTTP_404_NOT_FOUND}
+            )
+
+    return {'results': results}
 
 
 @router.delete('/{todo_id}', response_model=Message)
-def delete_todo(todo_id: int, session: Session, user: CurrentUser):
-    todo = session.scalar(
+async def delete_todo(todo_id: int, session: Session, user: CurrentUser):
+    todo = await session.scalar(
         select(Todo).where(Todo.user_id == user.id, Todo.id == todo_id)
     )
 
     if not todo:
         raise HTTPException(status_code=404, detail='Task not found.')
 
-    session.delete(todo)
-    session.commit()
+    await session.delete(todo)
+    await commit_changes(session, user.id)
 
     return {'detail': 'Task has been deleted successfully.'}
 
 
 @router.patch('/{todo_id}', response_model=TodoPublic)
-def patch_todo(
+async def patch_todo(
     todo_id: int, session: Session, user: CurrentUser, todo: TodoUpdate
 ):
-    db_todo = session.scalar(
-        select(Todo).where(Todo.user_id == user.id, Todo.id == todo_id)
+    query = select(Todo)
+    values = column_changes(todo)
+
+    if values:
+        query = (
+            update(Todo)
+            .values(**values)
+            .returning(Todo)
+            .execution_options(populate_existing=True)
+        )
+
+    db_todo = await session.scalar(
+        query.where(Todo.user_id == user.id, Todo.id == todo_id)
     )
 
     if not db_todo:
         raise HTTPException(status_code=404, detail='Task not found.')
 
-    for key, value in todo.model_dump(exclude_unset=True).items():
-        setattr(db_todo, key, value)
-
-    session.add(db_todo)
-    session.commit()
-    session.refresh(db_todo)
+    await commit_changes(session, user.id, bool(values))
 
     return db_todo
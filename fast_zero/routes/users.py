@@ -1,50 +1,119 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero.database import get_session
+from fast_zero.etags import (
+    bump_counter,
+    counter_version,
+    make_etag,
+    not_modified,
+)
 from fast_zero.models import User
+from fast_zero.ratelimit import limit_by_ip, limit_by_user
 from fast_zero.schemas import Message, UserList, UserPublic, UserSchema
-from fast_zero.security import get_current_user, get_password_hash
+from fast_zero.security import (
+    get_current_user,
+    get_password_hash,
+    invalidate_user_cache,
+    run_password_task,
+)
 
 router = APIRouter(prefix='/users', tags=['Users'])
 
-Session = Annotated[Session, Depends(get_session)]
+Session = Annotated[AsyncSession, Depends(get_session)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
+USER_PUBLIC_COLUMNS = [
+    getattr(User, field) for field in UserPublic.model_fields
+]
+
+
+UNIQUE_INDEX_FIELDS = {
+    'ix_users_username_lower': 'Username',
+    'ix_users_email_lower': 'Email',
+}
+
 
-@router.get('/', status_code=status.HTTP_200_OK, response_model=UserList)
-def read_users(skip: int = 0, limit: int = 100, session: Session = Session):
-    users = session.scalars(select(User).offset(skip).limit(limit)).all()
+def duplicate_user(error: IntegrityError):
+    for index, field in UNIQUE_INDEX_FIELDS.items():
+        if index in str(error.orig):
+            return HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'{field} already exists',
+            )
+
+    return error
+
+
+@router.get(
+    '/',
+    status_code=status.HTTP_200_OK,
+    response_model=UserList,
+    dependencies=[limit_by_ip('users')],
+)
+async def read_users(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    session: Session = Session,
+):
+    version = await counter_version(session, 'users')
+    etag = make_etag('users', version, skip, limit)
+    cached = not_modified(request, etag)
+
+    if cached is not None:
+        return cached
+
+    response.headers['ETag'] = etag
+    users = [
+        row._asdict()
+        for row in await session.execute(
+            select(*USER_PUBLIC_COLUMNS)
+            .order_by(User.id)
+            .offset(skip)
+            .limit(limit)
+        )
+    ]
     return {'users': users, 'count': len(users)}
 
 
 @router.post(
-    '/', status_code=status.HTTP_201_CREATED, response_model=UserPublic
+    '/',
+    status_code=status.HTTP_201_CREATED,
+    response_model=UserPublic,
+    dependencies=[limit_by_ip('users')],
 )
-def create_user(user: UserSchema, session: Session = Session):
-    db_user = session.scalar(
-        select(User).where(User.username == user.username)
-    )
-
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail='Username already exists',
+async def create_user(user: UserSchema, session: Session = Session):
+    hashed_password = await run_password_task(get_password_hash, user.password)
+
+    try:
+        db_user = await session.scalar(
+            insert(User)
+            .values(
+                email=user.email,
+                username=user.username,
+                password=hashed_password,
+            )
+            .returning(User)
         )
+        await session.execute(bump_counter('users'))
+        await session.commit()
+    except IntegrityError as error:
+        await session.rollback()
+        raise duplicate_user(error)
 
-    hashed_password = get_password_hash(user.password)
-
-    db_user = User(
-        email=user.email,
-        username=user.username,
-        password=hashed_password,
-    )
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
     return db_user
 
 
@@ -52,8 +121,9 @@ def create_user(user: UserSchema, session: Session = Session):
     '/{user_id}',
     status_code=status.HTTP_200_OK,
     response_model=UserPublic,
+    dependencies=[limit_by_user('users')],
 )
-def update_user(
+async def update_user(
     user_id: int,
     user: UserSchema,
     session: Session,
@@ -65,20 +135,35 @@ def update_user(
             detail='Not enough permissions',
         )
 
-    current_user.username = user.username
-    current_user.password = user.password
-    current_user.email = user.email
-    session.commit()
-    session.refresh(current_user)
-    return current_user
+    try:
+        db_user = await session.scalar(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                username=user.username,
+                password=user.password,
+                email=user.email,
+            )
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        await session.execute(bump_counter('users'))
+        await session.commit()
+    except IntegrityError as error:
+        await session.rollback()
+        raise duplicate_user(error)
+
+    invalidate_user_cache(user_id)
+    return db_user
 
 
 @router.delete(
     '/{user_id}',
     status_code=status.HTTP_404_NOT_FOUND,
     response_model=Message,
+    dependencies=[limit_by_user('users')],
 )
-def delete_user(
+async def delete_user(
     user_id: int,
     session: Session,
     current_user: CurrentUser,
@@ -96,7 +181,9 @@ def delete_user(
     #         status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
     #     )
 
-    session.delete(current_user)
-    session.commit()
+    await session.delete(await session.get(User, user_id))
+    await session.execute(bump_counter('users'))
+    await session.commit()
+    invalidate_user_cache(user_id)
 
     return {'detail': 'User deleted'}
@@ -41,13 +41,45 @@ class TodoSchema(BaseModel):
 
 class TodoPublic(TodoSchema):
     id: int
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ListTodos(BaseModel):
     todos: list[TodoPublic]
+    next_cursor: str | None = None
+
+
+class TodoStats(BaseModel):
+    total: int
+    states: dict[TodoState, int]
 
 
 class TodoUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     completed: str | None = None
+
+
+class TodoBulkUpdate(TodoUpdate):
+    id: int
+
+
+class TodoBulkResult(BaseModel):
+    id: int
+    status: int
+    todo: TodoPublic | None = None
+
+
+class TodoBulkResults(BaseModel):
+    results: list[TodoBulkResult]
+
+
+class TodoImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class TodoImportResults(BaseModel):
+    imported: int
+    failed: int
+    errors: list[TodoImportError]
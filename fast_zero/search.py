@@ -0,0 +1,82 @@
+from sqlalchemy import column, func, table
+
+from fast_zero.models import Todo
+
+MIN_TRIGRAM_LENGTH = 3
+
+todos_fts = table(
+    'todos_fts',
+    column('rowid'),
+    column('todos_fts'),
+    column('rank'),
+)
+
+
+def fts5_phrase(column_name: str, term: str):
+    escaped = term.replace('"', '""')
+    return f'{column_name} : "{escaped}"'
+
+
+def search_sqlite(query, terms: dict[str, str]):
+    phrases = []
+
+    for name, term in terms.items():
+        if len(term) >= MIN_TRIGRAM_LENGTH:
+            phrases.append(fts5_phrase(name, term))
+        else:
+            query = query.filter(getattr(Todo, name).contains(term))
+
+    if not phrases:
+        return query, False
+
+    query = (
+        query.join(todos_fts, todos_fts.c.rowid == Todo.id)
+        .filter(todos_fts.c.todos_fts.match(' AND '.join(phrases)))
+        .order_by(todos_fts.c.rank)
+    )
+    return query, True
+
+
+def search_postgresql(query, terms: dict[str, str]):
+    rank = None
+
+    for name, term in terms.items():
+        vector = func.to_tsvector('simple', getattr(Todo, name))
+        tsquery = func.plainto_tsquery('simple', term)
+        query = query.filter(vector.bool_op('@@')(tsquery))
+        term_rank = func.ts_rank(vector, tsquery)
+        rank = term_rank if rank is None else rank + term_rank
+
+    if rank is None:
+        return query, False
+
+    return query.order_by(rank.desc()), True
+
+
+def search_like(query, terms: dict[str, str]):
+    for name, term in terms.items():
+        query = query.filter(getattr(Todo, name).contains(term))
+
+    return query, False
+
+
+SEARCH_BACKENDS = {
+    'sqlite': search_sqlite,
+    'postgresql': search_postgresql,
+}
+
+
+def search_todos(
+    query,
+    dialect_name: str,
+    title: str | None = None,
+    description: str | None = None,
+):
+    terms = {
+        name: term
+        for name, term in (('title', title), ('description', description))
+        if term
+    }
+    search = SEARCH_BACKENDS.get(dialect_name, search_like)
+
+    return search(query, terms)
@@ -1,46 +1,142 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.cache import TTLCache
 from fast_zero.database import get_session
+from fast_zero.metrics import CallbackFamily
 from fast_zero.models import User
 from fast_zero.schemas import TokenData
-from fast_zero.settings import Settings
+from fast_zero.settings import get_settings
 
-settings = Settings()
+settings = get_settings()
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+PASSWORD_ROUNDS = {
+    'bcrypt': settings.BCRYPT_ROUNDS,
+    'scrypt': settings.SCRYPT_ROUNDS,
+    'argon2': settings.ARGON2_ROUNDS,
+}
+
+
+def create_password_context(schemes: list[str], rounds: dict[str, int]):
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=schemes,
+        deprecated='auto',
+        **{
+            f'{scheme}__rounds': rounds[scheme]
+            for scheme in schemes
+            if scheme in rounds
+        },
+    )
+
+
+@lru_cache
+def get_password_context():
+    return create_password_context(settings.PASSWORD_SCHEMES, PASSWORD_ROUNDS)
+
+
+@lru_cache
+def get_token_verifier():
+    from fast_zero.tokens import create_token_verifier
+
+    return create_token_verifier(settings)
+
+
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix='password-hash',
+)
+password_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+)
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAXSIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+CallbackFamily(
+    'user_cache_events_total',
+    'Authenticated user cache hits, misses and evictions.',
+    ('event',),
+    type='counter',
+    collect=lambda: [
+        ((event,), user_cache.stats()[event])
+        for event in ('hits', 'misses', 'evictions')
+    ],
+)
 
 
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({'exp': expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    return get_token_verifier().encode(to_encode)
 
 
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
+
+
+def password_needs_update(hashed_password: str):
+    return get_password_context().needs_update(hashed_password)
+
+
+async def run_password_task(func, *args):
+    if not password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Server is busy, try again later',
+            headers={'Retry-After': '1'},
+        )
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        password_slots.release()
+
+
+async def rehash_password(
+    session: AsyncSession, user_id: int, old_hash: str, password: str
+):
+    try:
+        new_hash = await run_password_task(get_password_hash, password)
+    except HTTPException:
+        return
+
+    await session.execute(
+        update(User)
+        .where(User.id == user_id, User.password == old_hash)
+        .values(password=new_hash)
+    )
+    await session.commit()
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='token')
 
 
+def invalidate_user_cache(user_id: int):
+    return user_cache.discard_where(lambda _, user: user['id'] == user_id)
+
+
 async def get_current_user(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     token: str = Depends(oauth2_scheme),
 ):
     credentials_exception = HTTPException(
@@ -50,7 +146,7 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = get_token_verifier().decode(token)
         username: str = payload.get('sub')
         if not username:
             raise credentials_exception
@@ -58,11 +154,27 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = session.scalar(
-        select(User).where(User.email == token_data.username)
-    )
+    session.info['subject'] = token_data.username.lower()
+    cached = user_cache.get(token)
 
-    if user is None:
-        raise credentials_exception
+    if cached is not None:
+        user = User(**cached)
+    else:
+        query = select(User).where(
+            func.lower(User.email) == func.lower(token_data.username)
+        )
+        user = await session.scalar(query)
+
+        if user is None and session.info.pop('replica', None) is not None:
+            # A replica may not have a new or renamed user yet.
+            user = await session.scalar(query)
+
+        if user is None:
+            raise credentials_exception
+
+        user_cache.set(
+            token,
+            {'id': user.id, 'username': user.username, 'email': user.email},
+        )
 
     return user
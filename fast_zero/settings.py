@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,3 +12,49 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    TOKEN_CACHE_MAXSIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAXSIZE: int = 10_000
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    PASSWORD_SCHEMES: list[str] = ['bcrypt']
+    BCRYPT_ROUNDS: int = 12
+    SCRYPT_ROUNDS: int = 16
+    ARGON2_ROUNDS: int = 3
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_CHECK_SECONDS: float = 10
+    DATABASE_REPLICA_STICKY_SECONDS: float = 5
+    DATABASE_REPLICA_STICKY_MAXSIZE: int = 10_000
+    TODO_PAGE_SIZE: int = 100
+    TODO_MAX_PAGE_SIZE: int = 1000
+    TODO_BULK_MAX_ITEMS: int = 1000
+    TODO_EXPORT_CHUNK_SIZE: int = 1000
+    TODO_IMPORT_CHUNK_SIZE: int = 1000
+    TODO_IMPORT_MAX_ERRORS: int = 100
+    TODO_IMPORT_MAX_RECORD_LINES: int = 100
+    SLOW_QUERY_MS: float = 100
+    METRICS_DIR: str | None = None
+    METRICS_FLUSH_SECONDS: float = 5
+    FAST_JSON_RESPONSES: bool = True
+    RESPONSE_CACHE_BACKEND: str = 'memory'
+    RESPONSE_CACHE_MAXSIZE: int = 10_000
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024**2
+    RESPONSE_CACHE_TTL_SECONDS: float = 60
+    RATE_LIMIT_BACKEND: str = 'memory'
+    RATE_LIMIT_STRATEGY: str = 'token_bucket'
+    RATE_LIMIT_MAXSIZE: int = 100_000
+    RATE_LIMIT_AUTH: str = '20/minute'
+    RATE_LIMIT_USERS: str = '120/minute'
+    RATE_LIMIT_TODOS: str = '600/minute'
+
+
+@lru_cache
+def get_settings():
+    return Settings()
@@ -0,0 +1,47 @@
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self.calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(self, key, func):
+        call = self.calls.get(key)
+
+        if call is not None:
+            self.coalesced += 1
+
+            try:
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                if not call.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+            return await func()
+
+        call = self.calls[key] = asyncio.get_running_loop().create_future()
+        self.executions += 1
+
+        try:
+            result = await func()
+        except Exception as error:
+            call.set_exception(error)
+            call.exception()  # retrieved, even if nobody was waiting
+            raise
+        except BaseException:
+            call.cancel()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self.calls[key]
+
+    def stats(self):
+        return {
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'in_flight': len(self.calls),
+        }
@@ -0,0 +1,119 @@
+import codecs
+import csv
+import io
+import json
+from enum import Enum
+from itertools import chain
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(value) -> bytes:
+    if orjson is None:  # pragma: no cover
+        return json.dumps(value, separators=(',', ':')).encode()
+
+    return orjson.dumps(value)
+
+
+def csv_value(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+async def ndjson_chunks(partitions):
+    async for rows in partitions:
+        yield b''.join(dumps(row._asdict()) + b'\n' for row in rows)
+
+
+async def csv_chunks(partitions, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    async for rows in partitions:
+        writer.writerows(map(csv_value, row) for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def text_lines(chunks, encoding: str = 'utf-8'):
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    pending = ''
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+
+        for line in lines:
+            yield line.removesuffix('\r')
+
+    pending += decoder.decode(b'', final=True)
+
+    if pending:
+        yield pending.removesuffix('\r')
+
+
+async def ndjson_records(lines):
+    number = 0
+
+    async for line in lines:
+        number += 1
+
+        if line.strip():
+            yield number, line
+
+
+def csv_values(record: list[str]):
+    reader = csv.reader(chain((line + '\n' for line in record), ['']))
+
+    try:
+        return next(reader, []), reader.line_num
+    except csv.Error:
+        return [], len(record)
+
+
+def csv_split(record: list, max_lines: int, final: bool = False):
+    while record:
+        values, consumed = csv_values([line for _, line in record])
+
+        if consumed > len(record):
+            if len(record) < max_lines and not final:
+                return
+
+            values, consumed = None, 1
+
+        yield record[0][0], values
+        del record[:consumed]
+
+
+async def csv_rows(lines, max_lines: int):
+    record = []
+    number = 0
+
+    async for line in lines:
+        number += 1
+        record.append((number, line))
+
+        for row in csv_split(record, max_lines):
+            yield row
+
+    for row in csv_split(record, max_lines, final=True):
+        yield row
+
+
+async def csv_records(lines, max_lines: int = 100):
+    fields = None
+
+    async for number, values in csv_rows(lines, max_lines):
+        if values is None:
+            yield number, None
+        elif fields is None:
+            fields = values
+        elif any(values):
+            yield number, dict(zip(fields, values))
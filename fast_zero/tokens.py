@@ -0,0 +1,117 @@
+import time
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+    Ed25519PublicKey,
+)
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from jose.constants import ALGORITHMS
+from jose.exceptions import JWKError
+
+from fast_zero.cache import TTLCache
+from fast_zero.settings import Settings
+
+
+class Ed25519Key(Key):
+    def __init__(self, key, algorithm):
+        if isinstance(key, str):
+            key = key.encode()
+
+        if isinstance(key, bytes):
+            try:
+                key = load_pem_private_key(key, password=None)
+            except ValueError:
+                key = load_pem_public_key(key)
+
+        if not isinstance(key, (Ed25519PrivateKey, Ed25519PublicKey)):
+            raise JWKError('EdDSA requires an Ed25519 key')
+
+        self._key = key
+        self._algorithm = algorithm
+
+    def sign(self, msg):
+        return self._key.sign(msg)
+
+    def verify(self, msg, sig):
+        try:
+            self.public_key()._key.verify(sig, msg)
+        except InvalidSignature:
+            return False
+
+        return True
+
+    def public_key(self):
+        if isinstance(self._key, Ed25519PublicKey):
+            return self
+
+        return Ed25519Key(self._key.public_key(), self._algorithm)
+
+
+jwk.register_key('EdDSA', Ed25519Key)
+
+
+class TokenVerifier:
+    def __init__(
+        self,
+        algorithm: str,
+        signing_key=None,
+        verification_key=None,
+        maxsize: int = 10_000,
+    ):
+        self.algorithm = algorithm
+        self.signing_key = None
+        self.verification_key = None
+
+        if signing_key is not None:
+            self.signing_key = jwk.construct(signing_key, algorithm)
+
+        if verification_key is not None:
+            self.verification_key = jwk.construct(verification_key, algorithm)
+        elif algorithm in ALGORITHMS.HMAC:
+            self.verification_key = self.signing_key
+        elif self.signing_key is not None:
+            self.verification_key = self.signing_key.public_key()
+
+        self.cache = TTLCache(maxsize=maxsize, ttl=0)
+
+    def encode(self, claims: dict):
+        if self.signing_key is None:
+            raise JWTError('No signing key configured')
+
+        return jwt.encode(claims, self.signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str):
+        now = time.time()
+        payload = self.cache.get(token)
+
+        if payload is not None and payload['exp'] > now:
+            return payload
+
+        payload = jwt.decode(
+            token, self.verification_key, algorithms=[self.algorithm]
+        )
+
+        if 'exp' in payload:
+            self.cache.set(token, payload, ttl=payload['exp'] - now)
+
+        return payload
+
+
+def create_token_verifier(settings: Settings):
+    if settings.ALGORITHM in ALGORITHMS.HMAC:
+        signing_key = settings.SECRET_KEY
+    else:
+        signing_key = settings.JWT_PRIVATE_KEY
+
+    return TokenVerifier(
+        settings.ALGORITHM,
+        signing_key=signing_key,
+        verification_key=settings.JWT_PUBLIC_KEY,
+        maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    )
@@ -0,0 +1,91 @@
+"""add todos full text search
+
+Revision ID: 8c130c2d956f
+Revises: 25d6fbb5df13
+Create Date: 2026-10-18 17:09:50.851431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c130c2d956f'
+down_revision: Union[str, None] = '25d6fbb5df13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE todos_fts USING fts5(
+        title, description, content='todos', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_fts_update
+    AFTER UPDATE OF title, description ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    'DROP TRIGGER todos_fts_update',
+    'DROP TRIGGER todos_fts_delete',
+    'DROP TRIGGER todos_fts_insert',
+    'DROP TABLE todos_fts',
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+    elif dialect == 'postgresql':
+        op.create_index(
+            'ix_todos_title_search',
+            'todos',
+            [sa.text("to_tsvector('simple', title)")],
+            postgresql_using='gin',
+        )
+        op.create_index(
+            'ix_todos_description_search',
+            'todos',
+            [sa.text("to_tsvector('simple', description)")],
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+
+    elif dialect == 'postgresql':
+        op.drop_index('ix_todos_description_search', table_name='todos')
+        op.drop_index('ix_todos_title_search', table_name='todos')
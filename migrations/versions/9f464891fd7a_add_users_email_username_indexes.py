@@ -0,0 +1,28 @@
+"""add users email and username unique indexes
+
+Revision ID: 9f464891fd7a
+Revises: 94aceca3b4a6
+Create Date: 2026-10-18 18:09:07.817085
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f464891fd7a'
+down_revision: Union[str, None] = '94aceca3b4a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+    op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_username_lower', table_name='users')
+    op.drop_index('ix_users_email_lower', table_name='users')
@@ -1,20 +1,31 @@
+from uuid import uuid4
+
 import factory
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from fast_zero.app import app
 from fast_zero.database import get_session
+from fast_zero.instrumentation import instrument_engine
 from fast_zero.models import Base, User
-from fast_zero.security import get_password_hash
+from fast_zero.ratelimit import rate_limiter
+from fast_zero.routes.todos import response_cache
+from fast_zero.security import get_password_hash, user_cache
 
 
 @pytest.fixture
-def session():
+def database():
+    return f'file:{uuid4().hex}?mode=memory&cache=shared&uri=true'
+
+
+@pytest.fixture
+def session(database):
     engine = create_engine(
-        'sqlite:///:memory:',
+        f'sqlite:///{database}',
         connect_args={'check_same_thread': False},
         poolclass=StaticPool,
     )
@@ -22,18 +33,61 @@ def session():
     Base.metadata.create_all(engine)
     yield Session()
     Base.metadata.drop_all(engine)
+    engine.dispose()
 
 
 @pytest.fixture
-def client(session):
-    def get_session_override():
-        return session
+def async_engine(database):
+    engine = create_async_engine(
+        f'sqlite+aiosqlite:///{database}', poolclass=StaticPool
+    )
+    instrument_engine(engine)
+    return engine
+
+
+@pytest.fixture
+def client(async_engine, session):
+    async def get_session_override():
+        async with AsyncSession(
+            async_engine, expire_on_commit=False
+        ) as session:
+            yield session
 
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
         yield client
+        client.portal.call(async_engine.dispose)
 
     app.dependency_overrides.clear()
+    user_cache.clear()
+    response_cache.clear()
+    rate_limiter.backend.clear()
+
+
+@pytest.fixture
+def statements(async_engine):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(async_engine.sync_engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def query_budget():
+    def check(response, budget: int):
+        timings = dict(
+            entry.strip().split(';', 1)
+            for entry in response.headers['Server-Timing'].split(',')
+        )
+        count = int(timings['db-queries'].removeprefix('desc='))
+
+        assert count <= budget, f'{count} queries, budget is {budget}'
+
+    return check
 
 
 class UserFactory(factory.Factory):
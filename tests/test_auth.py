@@ -1,5 +1,13 @@
+import threading
+
 from freezegun import freeze_time
 
+from fast_zero.security import (
+    create_password_context,
+    password_needs_update,
+    verify_password,
+)
+
 
 def test_get_token(client, user):
     response = client.post(
@@ -13,6 +21,39 @@ def test_get_token(client, user):
     assert 'token_type' in token
 
 
+def test_get_token_email_is_case_insensitive(client, user, statements):
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email.upper(), 'password': user.clean_password},
+    )
+
+    assert response.status_code == 200
+    assert 'lower(users.email)' in statements[0]
+
+
+def test_get_token_with_non_ascii_email(client):
+    user = {
+        'username': 'elodie',
+        'email': 'Élodie@example.com',
+        'password': 'secret',
+    }
+    client.post('/users/', json=user)
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user['email'], 'password': user['password']},
+    )
+    token = response.json()['access_token']
+
+    assert response.status_code == 200
+    assert (
+        client.post(
+            '/auth/refresh_token', headers={'Authorization': f'Bearer {token}'}
+        ).status_code
+        == 200
+    )
+
+
 def test_token_expired_after_time(client, user):
     with freeze_time('2024-01-08 00:00:00'):
         response = client.post(
@@ -84,3 +125,35 @@ def test_token_expired_dont_refresh(client, user):
         )
         assert response.status_code == 401
         assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_token_sheds_load_when_password_pool_is_full(
+    client, user, monkeypatch
+):
+    monkeypatch.setattr(
+        'fast_zero.security.password_slots', threading.BoundedSemaphore(0)
+    )
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_token_rehashes_outdated_password(session, client, user):
+    old_context = create_password_context(['bcrypt'], {'bcrypt': 4})
+    user.password = old_context.hash(user.clean_password)
+    session.commit()
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+    session.refresh(user)
+
+    assert response.status_code == 200
+    assert not password_needs_update(user.password)
+    assert verify_password(user.clean_password, user.password)
@@ -0,0 +1,92 @@
+from freezegun import freeze_time
+
+from fast_zero.cache import MemoryResponseCache, TTLCache
+
+
+def test_cache_hit_and_miss():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.evictions == 1
+
+
+def test_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    with freeze_time('2024-01-08 00:00:00'):
+        cache.set('a', 1)
+
+    with freeze_time('2024-01-08 00:01:01'):
+        assert cache.get('a') is None
+
+
+def test_cache_discard_where():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', {'id': 1})
+    cache.set('b', {'id': 2})
+
+    assert cache.discard_where(lambda _, value: value['id'] == 1) == 1
+    assert cache.get('a') is None
+    assert cache.get('b') == {'id': 2}
+
+
+def test_response_cache_evicts_by_bytes():
+    cache = MemoryResponseCache(maxsize=10, max_bytes=10, ttl=60)
+    cache.set(1, 'a', b'12345')
+    cache.set(1, 'b', b'12345')
+    cache.get(1, 'a')
+    cache.set(2, 'c', b'123')
+
+    assert cache.get(1, 'b') is None
+    assert cache.get(1, 'a') == b'12345'
+    assert cache.stats()['bytes'] == 8
+    assert cache.evictions == 1
+
+
+def test_response_cache_skips_oversized_values():
+    cache = MemoryResponseCache(maxsize=10, max_bytes=4, ttl=60)
+    cache.set(1, 'a', b'12345')
+
+    assert cache.get(1, 'a') is None
+    assert cache.stats()['bytes'] == 0
+
+
+def test_response_cache_invalidates_namespace():
+    cache = MemoryResponseCache(maxsize=10, max_bytes=100, ttl=60)
+    cache.set(1, 'a', b'a')
+    cache.set(1, 'b', b'b')
+    cache.set(2, 'a', b'c')
+
+    cache.invalidate(1)
+
+    assert cache.get(1, 'a') is None
+    assert cache.get(1, 'b') is None
+    assert cache.get(2, 'a') == b'c'
+    assert cache.stats()['invalidations'] == 2
+    assert cache.stats()['size'] == 1
+
+
+def test_response_cache_expires_entries():
+    cache = MemoryResponseCache(maxsize=10, max_bytes=100, ttl=60)
+
+    with freeze_time('2024-01-08 00:00:00'):
+        cache.set(1, 'a', b'a')
+
+    with freeze_time('2024-01-08 00:01:01'):
+        assert cache.get(1, 'a') is None
+        assert cache.stats()['bytes'] == 0
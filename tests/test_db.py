@@ -1,7 +1,13 @@
+import asyncio
+
+import pytest
 from sqlalchemy import select
+from sqlalchemy.exc import TimeoutError
 from sqlalchemy.orm import Session
 
+from fast_zero.database import create_engine, pool_metrics, pool_stats
 from fast_zero.models import Todo, User
+from fast_zero.settings import Settings
 
 
 def test_create_user(session):
@@ -29,3 +35,31 @@ def test_create_todo(session: Session, user: User):
     user = session.scalar(select(User).where(User.id == user.id))
 
     assert todo in user.todos
+
+
+def test_pool_records_checkouts_and_timeouts(tmp_path):
+    settings = Settings(
+        DATABASE_URL=f'sqlite+aiosqlite:///{tmp_path / "pool.db"}',
+        DATABASE_POOL_SIZE=1,
+        DATABASE_MAX_OVERFLOW=0,
+        DATABASE_POOL_TIMEOUT=0.1,
+    )
+    engine = create_engine(settings)
+    timeouts = pool_metrics.timeouts
+
+    async def exhaust_pool():
+        async with engine.connect():
+            stats = pool_stats(engine.pool)
+
+            with pytest.raises(TimeoutError):
+                async with engine.connect():
+                    pass
+
+        await engine.dispose()
+        return stats
+
+    stats = asyncio.run(exhaust_pool())
+
+    assert stats['in_use'] == 1
+    assert stats['idle'] == 0
+    assert pool_metrics.timeouts == timeouts + 1
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from fast_zero.instrumentation import (
+    QueryStats,
+    current_query_stats,
+    instrument_engine,
+    route_db_seconds,
+    route_query_count,
+)
+
+
+def test_server_timing_header(client, token):
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert 'db-queries;desc=3' in response.headers['Server-Timing']
+
+
+def test_route_histograms(client, token):
+    before = route_query_count.labels('GET', '/todos/').count
+
+    client.get('/todos/', headers={'Authorization': f'Bearer {token}'})
+
+    assert route_query_count.labels('GET', '/todos/').count == before + 1
+    assert route_db_seconds.labels('GET', '/todos/').sum > 0
+
+
+def test_list_todos_query_budget(client, token, query_budget):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+
+    query_budget(client.get('/todos/', headers=headers), 2)
+
+
+def test_query_stats_tracks_slowest_statement():
+    stats = QueryStats()
+    stats.record('SELECT 1', 0.001)
+    stats.record('SELECT 2', 0.003)
+    stats.record('SELECT 3', 0.002)
+
+    assert stats.count == 3
+    assert stats.slowest_statement == 'SELECT 2'
+
+
+def test_failed_statements_leave_no_timing_state():
+    engine = create_engine('sqlite://')
+    instrument_engine(engine)
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM missing'))
+        connection.execute(text('SELECT 1'))
+
+        assert 'query_start' not in connection.info
+
+    current_query_stats.reset(token)
+
+    assert stats.count == 1
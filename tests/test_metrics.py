@@ -0,0 +1,116 @@
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from fast_zero.app import app, settings
+from fast_zero.metrics import (
+    CallbackFamily,
+    CounterFamily,
+    HistogramFamily,
+    Registry,
+    render_metrics,
+    write_snapshot,
+)
+
+
+def test_render_counter_and_histogram():
+    registry = Registry()
+    counter = CounterFamily(
+        'requests_total', 'Requests.', ('route',), registry=registry
+    )
+    histogram = HistogramFamily(
+        'latency_seconds', 'Latency.', buckets=(0.1, 1), registry=registry
+    )
+    counter.inc(('/',))
+    counter.inc(('/',))
+    histogram.observe((), 0.5)
+    histogram.observe((), 5)
+
+    assert registry.render() == (
+        '# HELP requests_total Requests.\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{route="/"} 2\n'
+        '# HELP latency_seconds Latency.\n'
+        '# TYPE latency_seconds histogram\n'
+        'latency_seconds_bucket{le="0.1"} 0\n'
+        'latency_seconds_bucket{le="1"} 1\n'
+        'latency_seconds_bucket{le="+Inf"} 2\n'
+        'latency_seconds_sum 5.5\n'
+        'latency_seconds_count 2\n'
+    )
+
+
+def test_render_merges_worker_snapshots(tmp_path):
+    registry = Registry()
+    counter = CounterFamily(
+        'requests_total', 'Requests.', ('route',), registry=registry
+    )
+    counter.inc(('/',))
+    other_worker = {
+        'requests_total': {'type': 'counter', 'samples': [[['/'], 4]]}
+    }
+    (tmp_path / 'metrics-1.json').write_text(json.dumps(other_worker))
+
+    output = render_metrics(str(tmp_path), registry)
+
+    assert 'requests_total{route="/"} 5' in output
+
+
+def test_render_drops_gauges_of_exited_workers(tmp_path):
+    registry = Registry()
+    CallbackFamily(
+        'pool', 'Pool.', collect=lambda: [((), 5)], registry=registry
+    )
+    worker = {
+        'pool': {'type': 'gauge', 'samples': [[[], 5]]},
+        'requests_total': {'type': 'counter', 'samples': [[[], 1]]},
+    }
+    (tmp_path / 'metrics-1.json').write_text(json.dumps(worker))
+    (tmp_path / 'metrics-2.json').write_text(json.dumps(worker))
+    os.utime(tmp_path / 'metrics-2.json', (0, 0))
+
+    output = render_metrics(str(tmp_path), registry, stale_after=15)
+
+    assert 'pool 10\n' in output
+
+
+def test_final_snapshot_omits_gauges(tmp_path):
+    registry = Registry()
+    CallbackFamily(
+        'pool', 'Pool.', collect=lambda: [((), 5)], registry=registry
+    )
+    CounterFamily('requests_total', 'Requests.', registry=registry).inc()
+
+    write_snapshot(str(tmp_path), registry, final=True)
+    snapshot = json.loads(
+        (tmp_path / f'metrics-{os.getpid()}.json').read_text()
+    )
+
+    assert list(snapshot) == ['requests_total']
+
+
+def test_startup_clears_snapshots_of_earlier_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'METRICS_DIR', str(tmp_path))
+    (tmp_path / 'metrics-1.json').write_text('{}')
+
+    with TestClient(app):
+        assert not (tmp_path / 'metrics-1.json').exists()
+
+    assert [path.name for path in tmp_path.iterdir()] == [
+        f'metrics-{os.getpid()}.json'
+    ]
+
+
+def test_metrics_endpoint(client):
+    client.get('/')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    assert (
+        'http_requests_total{method="GET",route="/",status="200"}'
+        in response.text
+    )
+    assert 'http_request_duration_seconds_bucket' in response.text
@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from freezegun import freeze_time
+
+from fast_zero.ratelimit import (
+    MemoryRateLimitBackend,
+    parse_rate,
+    rate_limiter,
+    sliding_window,
+    token_bucket,
+)
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    def set_limit(scope: str, rate: str):
+        monkeypatch.setitem(rate_limiter.limits, scope, parse_rate(rate))
+
+    return set_limit
+
+
+def test_parse_rate():
+    assert parse_rate('10/minute') == (10, 60.0)
+    assert parse_rate('3/2.5') == (3, 2.5)
+
+    with pytest.raises(ValueError):
+        parse_rate('0/second')
+
+
+def test_token_bucket_refills_over_time():
+    state = None
+
+    for _ in range(2):
+        state, retry_after = token_bucket(state, 0, limit=2, period=10)
+        assert retry_after == 0
+
+    state, retry_after = token_bucket(state, 0, limit=2, period=10)
+    assert retry_after == 5
+
+    state, retry_after = token_bucket(state, 5, limit=2, period=10)
+    assert retry_after == 0
+
+
+def test_sliding_window_weights_previous_window():
+    state = None
+
+    for now in (0, 1):
+        state, retry_after = sliding_window(state, now, limit=2, period=10)
+        assert retry_after == 0
+
+    state, retry_after = sliding_window(state, 2, limit=2, period=10)
+    assert retry_after == 13
+
+    state, retry_after = sliding_window(state, 12, limit=2, period=10)
+    assert retry_after == 3
+
+    state, retry_after = sliding_window(state, 15, limit=2, period=10)
+    assert retry_after == 0
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryRateLimitBackend(maxsize=2)
+
+    with freeze_time('2024-01-08 00:00:00'):
+        assert backend.hit('a', 1, 60) == 0
+        assert backend.hit('b', 1, 60) == 0
+        assert backend.hit('c', 1, 60) == 0
+        assert backend.hit('a', 1, 60) == 0
+        assert backend.hit('c', 1, 60) == 60
+
+    assert backend.stats()['size'] == 2
+    assert backend.stats()['evictions'] == 2
+
+
+def test_login_is_limited_by_client_address(client, user, limits):
+    limits('auth', '2/minute')
+    data = {'username': user.email, 'password': 'wrong'}
+
+    with freeze_time():
+        for _ in range(2):
+            response = client.post('/auth/token', data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = client.post('/auth/token', data=data)
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.json() == {'detail': 'Too many requests'}
+    assert response.headers['Retry-After'] == '30'
+
+
+def test_todos_are_limited_per_user(client, token, other_user, limits):
+    limits('todos', '1/minute')
+    other_token = client.post(
+        '/auth/token',
+        data={'username': other_user.email, 'password': 'testtest'},
+    ).json()['access_token']
+
+    with freeze_time():
+        response = client.get(
+            '/todos/', headers={'Authorization': f'Bearer {token}'}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        response = client.get(
+            '/todos/', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.headers['Retry-After'] == '60'
+
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {other_token}'}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_rejections_are_counted_in_metrics(client, limits):
+    limits('users', '1/minute')
+    client.get('/users/')
+    client.get('/users/')
+
+    response = client.get('/metrics')
+
+    assert 'http_rate_limited_total{scope="users"}' in response.text
+    assert 'rate_limiter{stat="rejected"}' in response.text
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from fast_zero import database
+from fast_zero.app import app
+from fast_zero.database import ReplicaSet
+from fast_zero.models import Base, Todo, User
+from fast_zero.ratelimit import rate_limiter
+from fast_zero.routes.todos import response_cache
+from fast_zero.security import create_access_token, user_cache
+
+
+def sqlite_files(tmp_path, *names):
+    engines = []
+
+    for name in names:
+        engine = create_engine(f'sqlite:///{tmp_path / name}')
+        Base.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            session.add(
+                User(username='test', email='test@test.com', password='-')
+            )
+            session.commit()
+
+        engines.append(engine)
+
+    return engines
+
+
+def corrupt_sqlite_file(path):
+    path.write_bytes(b'not a database' * 100)
+    return create_async_engine(f'sqlite+aiosqlite:///{path}')
+
+
+def titles(engine):
+    with Session(engine) as session:
+        return list(session.scalars(select(Todo.title).order_by(Todo.id)))
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    primary, replica = sqlite_files(tmp_path, 'primary.db', 'replica.db')
+
+    with Session(replica) as session:
+        session.add(
+            Todo(title='replica', description='-', state='todo', user_id=1)
+        )
+        session.commit()
+
+    replicas = ReplicaSet(
+        [create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "replica.db"}')]
+    )
+    primary_engine = create_async_engine(
+        f'sqlite+aiosqlite:///{tmp_path / "primary.db"}'
+    )
+    monkeypatch.setattr(database, 'get_engine', lambda: primary_engine)
+    monkeypatch.setattr(database, 'get_replica_set', lambda: replicas)
+    token = create_access_token(data={'sub': 'test@test.com'})
+
+    with TestClient(app) as client:
+        client.headers['Authorization'] = f'Bearer {token}'
+        yield client, primary, replica, replicas
+        client.portal.call(primary_engine.dispose)
+        client.portal.call(replicas.dispose)
+
+    user_cache.clear()
+    response_cache.clear()
+    rate_limiter.backend.clear()
+
+
+def test_reads_go_to_replica_and_writes_to_primary(replicated):
+    client, primary, replica, replicas = replicated
+
+    response = client.get('/todos/')
+
+    assert [todo['title'] for todo in response.json()['todos']] == ['replica']
+    assert replicas.selected == [1]
+
+    response = client.post(
+        '/todos/', json={'title': 'new', 'description': '-', 'state': 'todo'}
+    )
+
+    assert response.status_code == 200
+    assert titles(primary) == ['new']
+    assert titles(replica) == ['replica']
+
+
+def test_reads_stick_to_primary_after_a_write(replicated):
+    client, primary, replica, replicas = replicated
+    client.post(
+        '/todos/', json={'title': 'new', 'description': '-', 'state': 'todo'}
+    )
+
+    response = client.get('/todos/')
+
+    assert [todo['title'] for todo in response.json()['todos']] == ['new']
+
+    replicas.recent_writes.clear()
+    response = client.get('/todos/')
+
+    assert [todo['title'] for todo in response.json()['todos']] == ['replica']
+
+
+def test_round_robin_skips_unhealthy_replicas(tmp_path):
+    sqlite_files(tmp_path, 'a.db', 'b.db')
+    engines = [
+        create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "a.db"}'),
+        create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "b.db"}'),
+        corrupt_sqlite_file(tmp_path / 'c.db'),
+    ]
+    replicas = ReplicaSet(engines)
+
+    async def check():
+        await replicas.check()
+        chosen = [replicas.choose() for _ in range(4)]
+        await replicas.dispose()
+        return chosen
+
+    chosen = asyncio.run(check())
+
+    assert chosen == [engines[0], engines[1], engines[0], engines[1]]
+    assert dict(replicas.stats())[('2', 'healthy')] == 0
+
+
+def test_no_healthy_replica_falls_back_to_primary(tmp_path):
+    replicas = ReplicaSet([corrupt_sqlite_file(tmp_path / 'replica.db')])
+
+    async def check():
+        await replicas.check()
+        await replicas.dispose()
+
+    asyncio.run(check())
+
+    assert replicas.choose() is None
+
+
+def test_user_lookup_reads_its_own_writes(replicated):
+    client, primary, replica, replicas = replicated
+    response = client.put(
+        '/users/1',
+        json={'username': 'test', 'email': 'new@test.com', 'password': '-'},
+    )
+    assert response.status_code == 200
+
+    new_token = create_access_token(data={'sub': 'new@test.com'})
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {new_token}'}
+    )
+
+    assert response.status_code == 200
+    assert response.json()['todos'] == []
+
+    response = client.get('/todos/')
+
+    assert response.status_code == 401
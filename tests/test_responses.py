@@ -0,0 +1,28 @@
+import pytest
+from fastapi.responses import JSONResponse
+
+from fast_zero.app import app
+from fast_zero.responses import FastJSONResponse
+from fast_zero.schemas import ListTodos, TodoPublic, UserList, UserPublic
+
+TODO = {'id': 1, 'title': 'Tarefa ç', 'description': '"x"', 'state': 'draft'}
+USER = {'id': 1, 'username': 'alice', 'email': 'alice@example.com'}
+
+
+@pytest.mark.parametrize(
+    'model',
+    [
+        TodoPublic(**TODO),
+        ListTodos(todos=[TodoPublic(**TODO)] * 3, next_cursor='Mw=='),
+        UserPublic(**USER),
+        UserList(users=[UserPublic(**USER)] * 3),
+    ],
+)
+def test_fast_json_matches_stdlib_output(model):
+    content = model.model_dump(mode='json')
+
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_app_uses_fast_json_responses():
+    assert app.router.default_response_class is FastJSONResponse
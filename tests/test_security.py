@@ -1,6 +1,6 @@
 from jose import jwt
 
-from fast_zero.security import SECRET_KEY, create_access_token
+from fast_zero.security import SECRET_KEY, create_access_token, user_cache
 
 
 def test_jwt():
@@ -11,3 +11,32 @@ def test_jwt():
 
     assert decoded['test'] == data['test']
     assert decoded['exp']
+
+
+def test_current_user_is_cached(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    hits = user_cache.hits
+    client.get('/todos/', headers=headers)
+    client.get('/todos/', headers=headers)
+
+    assert user_cache.hits == hits + 1
+    assert len(user_cache) == 1
+
+
+def test_update_user_invalidates_cached_user(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': 'bob',
+            'email': 'bob@example.com',
+            'password': 'mynewpassword',
+        },
+    )
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == 401
+    assert len(user_cache) == 0
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from fast_zero.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        call = calls
+        await asyncio.sleep(0.01)
+        return call
+
+    async def run():
+        return await asyncio.gather(
+            *(flights.run('a', load) for _ in range(3)), flights.run('b', load)
+        )
+
+    assert sorted(asyncio.run(run())) == [1, 1, 1, 2]
+    assert flights.stats() == {'executions': 2, 'coalesced': 2, 'in_flight': 0}
+
+
+def test_sequential_calls_are_not_coalesced():
+    flights = SingleFlight()
+
+    async def load():
+        return object()
+
+    async def run():
+        return await flights.run('a', load), await flights.run('a', load)
+
+    first, second = asyncio.run(run())
+
+    assert first is not second
+    assert flights.coalesced == 0
+
+
+def test_waiters_share_the_leaders_exception():
+    flights = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError('boom')
+
+    async def run():
+        return await asyncio.gather(
+            flights.run('a', load),
+            flights.run('a', load),
+            return_exceptions=True,
+        )
+
+    leader, waiter = asyncio.run(run())
+
+    assert isinstance(leader, ValueError)
+    assert waiter is leader
+    assert calls == 1
+
+
+def test_waiters_retry_when_the_leader_is_cancelled():
+    flights = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        call = calls
+        await asyncio.sleep(0.01)
+        return call
+
+    async def run():
+        leader = asyncio.create_task(flights.run('a', load))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flights.run('a', load))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        return await waiter
+
+    assert asyncio.run(run()) == 2
+
+
+def test_waiter_cancellation_does_not_cancel_the_leader():
+    flights = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        return 'done'
+
+    async def run():
+        leader = asyncio.create_task(flights.run('a', load))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flights.run('a', load))
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        return await leader
+
+    assert asyncio.run(run()) == 'done'
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+
+FRAMEWORK = ('fastapi', 'pydantic', 'sqlalchemy')
+IMPORT_BUDGET_RATIO = 0.5
+APP_PACKAGES = {'fast_zero', 'jose', 'pydantic_settings', 'sqlalchemy'}
+LAZY_MODULES = {'passlib.context', 'jose.jwk', 'fast_zero.tokens'}
+
+
+def import_times(code: str):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        times[name.strip()] = (
+            int(cumulative) / 1_000_000,
+            name.startswith('  '),
+        )
+
+    return times, result.stdout.strip()
+
+
+def test_app_import_time_budget():
+    times, _ = import_times(
+        f'import {", ".join(FRAMEWORK)}; import fast_zero.app'
+    )
+    framework = sum(
+        cumulative
+        for name, (cumulative, nested) in times.items()
+        if name in FRAMEWORK and not nested
+    )
+
+    assert times['fast_zero.app'][0] < framework * IMPORT_BUDGET_RATIO
+
+
+def test_app_import_loads_only_expected_packages():
+    _, packages = import_times(
+        'import sys; '
+        f'import {", ".join(FRAMEWORK)}; '
+        'before = set(sys.modules); '
+        'import fast_zero.app; '
+        'loaded = {m.partition(".")[0] for m in set(sys.modules) - before}; '
+        'print(*sorted(loaded - set(sys.stdlib_module_names)))'
+    )
+
+    assert set(packages.split()) <= APP_PACKAGES
+
+
+def test_app_import_defers_engine_and_crypto():
+    times, engines = import_times(
+        'import fast_zero.app; from fast_zero.database import get_engine; '
+        'print(get_engine.cache_info().currsize)'
+    )
+
+    assert LAZY_MODULES.isdisjoint(times)
+    assert engines == '0'
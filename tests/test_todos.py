@@ -1,4 +1,18 @@
+import asyncio
+import csv
+import io
+import json
+import os
+from base64 import urlsafe_b64encode
+
+import httpx
+import pytest
+from sqlalchemy import text
+
+from fast_zero.app import app
 from fast_zero.models import TodoState
+from fast_zero.routes import todos
+from fast_zero.routes.todos import list_flights, response_cache, settings
 from tests.factories import TodoFactory
 
 
@@ -45,6 +59,54 @@ def test_list_todos_pagination(session, user, client, token):
     assert len(response.json()['todos']) == 2
 
 
+def test_list_todos_cursor_pagination(session, user, client, token):
+    session.bulk_save_objects(TodoFactory.create_batch(5, user_id=user.id))
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first_page = client.get('/todos/?limit=3', headers=headers).json()
+    second_page = client.get(
+        f'/todos/?limit=3&cursor={first_page["next_cursor"]}',
+        headers=headers,
+    ).json()
+
+    ids = [todo['id'] for todo in first_page['todos'] + second_page['todos']]
+    assert ids == [1, 2, 3, 4, 5]
+    assert second_page['next_cursor'] is None
+
+
+def test_list_todos_invalid_cursor(client, token):
+    response = client.get(
+        '/todos/?cursor=invalid',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Invalid cursor.'}
+
+
+@pytest.mark.parametrize('value', ['9' * 30, '-1'])
+def test_list_todos_cursor_out_of_range(client, token, value):
+    cursor = urlsafe_b64encode(value.encode()).decode()
+
+    response = client.get(
+        f'/todos/?cursor={cursor}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Invalid cursor.'}
+
+
+def test_list_todos_limit_above_maximum(client, token):
+    response = client.get(
+        '/todos/?limit=1001',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == 422
+
+
 def test_list_todos_filter_title(session, user, client, token):
     session.bulk_save_objects(
         TodoFactory.create_batch(5, user_id=user.id, title='Test todo 1')
@@ -162,3 +224,568 @@ def test_patch_todo(session, client, user, token):
     )
     assert response.status_code == 200
     assert response.json()['title'] == 'teste!'
+
+
+def test_list_todos_search_ranks_by_relevance(session, user, client, token):
+    session.add_all(
+        [
+            TodoFactory(user_id=user.id, title='buy milk', description='x'),
+            TodoFactory(
+                user_id=user.id, title='milk milk milk', description='x'
+            ),
+            TodoFactory(
+                user_id=user.id, title='walk the dog', description='x'
+            ),
+        ]
+    )
+    session.commit()
+
+    response = client.get(
+        '/todos/?title=milk',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    titles = [todo['title'] for todo in response.json()['todos']]
+    assert titles == ['milk milk milk', 'buy milk']
+
+
+def test_list_todos_search_follows_updates(session, client, user, token):
+    todo = TodoFactory(user_id=user.id, title='old title')
+    session.add(todo)
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.patch(
+        f'/todos/{todo.id}', json={'title': 'new title'}, headers=headers
+    )
+
+    old = client.get('/todos/?title=old', headers=headers).json()
+    new = client.get('/todos/?title=new', headers=headers).json()
+
+    assert old['todos'] == []
+    assert len(new['todos']) == 1
+
+
+def test_list_todos_search_short_term(session, user, client, token):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(2, user_id=user.id, title='a b c')
+    )
+    session.commit()
+
+    response = client.get(
+        '/todos/?title=b',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['todos']) == 2
+
+
+def test_create_todos_in_bulk(client, token):
+    response = client.post(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'title': 'first', 'description': 'a', 'state': 'draft'},
+            {'title': 'second', 'description': 'b', 'state': 'todo'},
+        ],
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'results': [
+            {
+                'id': 1,
+                'status': 201,
+                'todo': {
+                    'id': 1,
+                    'title': 'first',
+                    'description': 'a',
+                    'state': 'draft',
+                },
+            },
+            {
+                'id': 2,
+                'status': 201,
+                'todo': {
+                    'id': 2,
+                    'title': 'second',
+                    'description': 'b',
+                    'state': 'todo',
+                },
+            },
+        ]
+    }
+
+
+def test_create_todos_in_bulk_rejects_empty_batch(client, token):
+    response = client.post(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[],
+    )
+
+    assert response.status_code == 422
+
+
+def test_patch_todos_in_bulk(session, client, user, other_user, token):
+    todo = TodoFactory(user_id=user.id, title='mine')
+    other_todo = TodoFactory(user_id=other_user.id, title='not mine')
+    session.add_all([todo, other_todo])
+    session.commit()
+
+    response = client.patch(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'id': todo.id, 'title': 'changed'},
+            {'id': other_todo.id, 'title': 'changed'},
+        ],
+    )
+    session.refresh(other_todo)
+
+    results = response.json()['results']
+    assert results[0]['status'] == 200
+    assert results[0]['todo']['title'] == 'changed'
+    assert results[1] == {'id': other_todo.id, 'status': 404, 'todo': None}
+    assert other_todo.title == 'not mine'
+
+
+def test_delete_todos_in_bulk(session, client, user, token):
+    session.bulk_save_objects(TodoFactory.create_batch(2, user_id=user.id))
+    session.commit()
+
+    response = client.post(
+        '/todos/bulk/delete',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[1, 2, 3],
+    )
+
+    assert response.json() == {
+        'results': [
+            {'id': 1, 'status': 200, 'todo': None},
+            {'id': 2, 'status': 200, 'todo': None},
+            {'id': 3, 'status': 404, 'todo': None},
+        ]
+    }
+
+
+def test_create_todo_statement_count(client, token, statements):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+    statements.clear()
+
+    client.post(
+        '/todos/',
+        headers=headers,
+        json={'title': 'a', 'description': 'b', 'state': 'draft'},
+    )
+
+    assert len(statements) == 2
+    assert statements[0].startswith('INSERT INTO todos')
+    assert statements[1].startswith('UPDATE users SET todos_version')
+
+
+def test_patch_todo_statement_count(session, client, user, token, statements):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+    statements.clear()
+
+    client.patch(f'/todos/{todo.id}', json={'title': 'x'}, headers=headers)
+
+    assert len(statements) == 2
+    assert statements[0].startswith('UPDATE todos')
+    assert statements[1].startswith('UPDATE users SET todos_version')
+
+
+def test_export_todos_ndjson(session, client, user, other_user, token):
+    session.bulk_save_objects(TodoFactory.create_batch(3, user_id=user.id))
+    session.bulk_save_objects(
+        TodoFactory.create_batch(2, user_id=other_user.id)
+    )
+    session.commit()
+
+    response = client.get(
+        '/todos/export', headers={'Authorization': f'Bearer {token}'}
+    )
+    listed = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [
+        json.loads(line) for line in response.text.splitlines()
+    ] == listed.json()['todos']
+
+
+def test_export_todos_csv(session, client, user, token):
+    session.bulk_save_objects(
+        TodoFactory.create_batch(2, user_id=user.id, state=TodoState.done)
+    )
+    session.commit()
+
+    response = client.get(
+        '/todos/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert response.headers['content-type'].startswith('text/csv')
+    assert [row['id'] for row in rows] == ['1', '2']
+    assert {row['state'] for row in rows} == {'done'}
+
+
+def test_export_todos_without_todos(client, token):
+    response = client.get(
+        '/todos/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.text.splitlines() == ['title,description,state,id']
+
+
+@pytest.mark.skipif(
+    not os.path.exists('/proc/self/statm'), reason='needs /proc'
+)
+def test_export_todos_memory_is_bounded(session, client, user, token):
+    rows = 1_000_000
+    ceiling = 64 * 1024**2
+    session.execute(
+        text(
+            'WITH RECURSIVE seq(n) AS '
+            '(SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :rows) '
+            'INSERT INTO todos (title, description, state, user_id) '
+            "SELECT 'todo ' || n, 'description', 'todo', :user_id FROM seq"
+        ),
+        {'rows': rows, 'user_id': user.id},
+    )
+    session.commit()
+
+    def rss():
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+    async def export():
+        baseline = rss()
+        peak = 0
+        lines = 0
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal peak, lines
+            if message['type'] == 'http.response.body':
+                lines += message['body'].count(b'\n')
+                peak = max(peak, rss() - baseline)
+
+        await app(
+            {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': '/todos/export',
+                'raw_path': b'/todos/export',
+                'query_string': b'',
+                'root_path': '',
+                'headers': [
+                    (b'authorization', f'Bearer {token}'.encode()),
+                ],
+                'client': ('testclient', 50000),
+                'server': ('testserver', 80),
+            },
+            receive,
+            send,
+        )
+        return lines, peak
+
+    lines, peak = client.portal.call(export)
+
+    assert lines == rows
+    assert peak < ceiling
+
+
+def test_import_todos_ndjson(client, token):
+    body = '\n'.join(
+        [
+            '{"title": "a", "description": "a", "state": "todo"}',
+            '',
+            '{"title": "b", "description": "b", "state": "unknown"}',
+            '{"title": "c"',
+            '{"title": "d", "description": "d", "state": "done"}',
+        ]
+    )
+
+    response = client.post(
+        '/todos/import',
+        content=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    listed = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.json()['imported'] == 2
+    assert response.json()['failed'] == 2
+    assert [error['line'] for error in response.json()['errors']] == [3, 4]
+    assert response.json()['errors'][0]['detail'].startswith('state: ')
+    assert [todo['title'] for todo in listed.json()['todos']] == ['a', 'd']
+
+
+def test_import_todos_csv_round_trip(session, client, user, token):
+    session.bulk_save_objects(
+        [
+            TodoFactory(description='multi\nline, "quoted"', user_id=user.id),
+            TodoFactory(user_id=user.id),
+        ]
+    )
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    exported = client.get('/todos/export?format=csv', headers=headers)
+
+    response = client.post(
+        '/todos/import?format=csv', content=exported.content, headers=headers
+    )
+    listed = client.get('/todos/', headers=headers).json()['todos']
+
+    assert response.json() == {'imported': 2, 'failed': 0, 'errors': []}
+    assert [todo['description'] for todo in listed[2:]] == [
+        todo['description'] for todo in listed[:2]
+    ]
+
+
+def test_import_todos_csv_literal_quote(client, token):
+    body = 'title,description,state\na,"5"" screen",todo\nb,5" screen,todo\n'
+    body += ''.join(f'todo {n},-,todo\n' for n in range(5000))
+
+    response = client.post(
+        '/todos/import?format=csv',
+        content=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json() == {'imported': 5002, 'failed': 0, 'errors': []}
+
+
+def test_import_todos_csv_unterminated_quote(client, token, monkeypatch):
+    monkeypatch.setattr(settings, 'TODO_IMPORT_MAX_RECORD_LINES', 3)
+    body = 'title,description,state\na,"open,todo\n'
+    body += ''.join(f'todo {n},-,todo\n' for n in range(5))
+
+    response = client.post(
+        '/todos/import?format=csv',
+        content=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json()['imported'] == 5
+    assert response.json()['failed'] == 1
+    assert [error['line'] for error in response.json()['errors']] == [2]
+
+
+def test_import_todos_commits_in_chunks(
+    client, token, statements, monkeypatch
+):
+    monkeypatch.setattr(settings, 'TODO_IMPORT_CHUNK_SIZE', 2)
+    body = b''.join(
+        b'{"title": "t", "description": "d", "state": "todo"}\n'
+        for _ in range(5)
+    )
+
+    response = client.post(
+        '/todos/import',
+        content=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    inserts = [s for s in statements if s.startswith('INSERT INTO todos')]
+
+    assert response.json()['imported'] == 5
+    assert len(inserts) == 3
+
+
+def test_todo_stats(session, client, user, other_user, token):
+    session.bulk_save_objects(
+        [
+            *TodoFactory.create_batch(3, user_id=user.id, state='done'),
+            *TodoFactory.create_batch(2, user_id=user.id, state='todo'),
+            *TodoFactory.create_batch(4, user_id=other_user.id, state='todo'),
+        ]
+    )
+    session.commit()
+
+    response = client.get(
+        '/todos/stats', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.json() == {
+        'total': 5,
+        'states': {
+            'draft': 0,
+            'todo': 2,
+            'doing': 0,
+            'done': 3,
+            'trash': 0,
+        },
+    }
+
+
+def test_todo_stats_filter(session, client, user, token, statements):
+    session.bulk_save_objects(
+        [
+            TodoFactory(title='Buy milk', user_id=user.id, state='done'),
+            TodoFactory(title='Buy eggs', user_id=user.id, state='todo'),
+            TodoFactory(title='Walk dog', user_id=user.id, state='todo'),
+        ]
+    )
+    session.commit()
+
+    response = client.get(
+        '/todos/stats?title=buy',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json()['total'] == 2
+    assert response.json()['states']['done'] == 1
+    assert 'GROUP BY' in statements[-1]
+
+
+def test_list_todos_not_modified(session, client, user, token, statements):
+    session.bulk_save_objects(TodoFactory.create_batch(2, user_id=user.id))
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/todos/?limit=5', headers=headers)
+    statements.clear()
+
+    cached = client.get(
+        '/todos/?limit=5',
+        headers={**headers, 'If-None-Match': response.headers['ETag']},
+    )
+
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == response.headers['ETag']
+    assert cached.content == b''
+    assert len(statements) == 1
+    assert statements[0].startswith('SELECT users.todos_version')
+
+
+def test_list_todos_etag_depends_on_params(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = client.get('/todos/?limit=5', headers=headers)
+    second = client.get('/todos/?limit=6', headers=headers)
+
+    assert first.headers['ETag'] != second.headers['ETag']
+
+
+def test_list_todos_etag_changes_on_mutation(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    etags = [client.get('/todos/', headers=headers).headers['ETag']]
+
+    todo = client.post(
+        '/todos/',
+        headers=headers,
+        json={'title': 'a', 'description': 'b', 'state': 'draft'},
+    ).json()
+    etags.append(client.get('/todos/', headers=headers).headers['ETag'])
+
+    client.patch(f'/todos/{todo["id"]}', headers=headers, json={'title': 'x'})
+    etags.append(client.get('/todos/', headers=headers).headers['ETag'])
+
+    client.delete(f'/todos/{todo["id"]}', headers=headers)
+    etags.append(client.get('/todos/', headers=headers).headers['ETag'])
+
+    stale = client.get(
+        '/todos/', headers={**headers, 'If-None-Match': etags[0]}
+    )
+
+    assert len(set(etags)) == 4
+    assert stale.status_code == 200
+
+
+def test_list_todos_served_from_cache(
+    session, client, user, token, statements
+):
+    session.bulk_save_objects(TodoFactory.create_batch(2, user_id=user.id))
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/todos/?state=todo&limit=5', headers=headers)
+    hits = response_cache.stats()['hits']
+    statements.clear()
+
+    cached = client.get('/todos/?limit=5&state=todo', headers=headers)
+
+    assert cached.content == response.content
+    assert len(statements) == 1
+    assert statements[0].startswith('SELECT users.todos_version')
+    assert response_cache.stats()['hits'] == hits + 1
+
+
+def test_list_todos_cache_key_ignores_defaults_and_unknown_params(
+    client, token, statements
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/todos/', headers=headers)
+    statements.clear()
+
+    for url in ('/todos/?limit=100', '/todos/?junk=1'):
+        cached = client.get(
+            url,
+            headers={**headers, 'If-None-Match': response.headers['ETag']},
+        )
+        assert cached.status_code == 304
+
+    assert len(statements) == 2
+    assert all(s.startswith('SELECT users.todos_version') for s in statements)
+
+
+def test_list_todos_cache_invalidated_on_mutation(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+    invalidations = response_cache.stats()['invalidations']
+
+    client.post(
+        '/todos/',
+        headers=headers,
+        json={'title': 'a', 'description': 'b', 'state': 'draft'},
+    )
+    response = client.get('/todos/', headers=headers)
+
+    assert len(response.json()['todos']) == 1
+    assert response_cache.stats()['invalidations'] == invalidations + 1
+
+
+def test_concurrent_list_todos_are_coalesced(client, token, monkeypatch):
+    render_todos = todos.render_todos
+    renders = 0
+
+    async def slow_render_todos(*args):
+        nonlocal renders
+        renders += 1
+        await asyncio.sleep(0.05)
+        return await render_todos(*args)
+
+    monkeypatch.setattr(todos, 'render_todos', slow_render_todos)
+    coalesced = list_flights.coalesced
+
+    async def fetch_concurrently():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url='http://testserver',
+            headers={'Authorization': f'Bearer {token}'},
+        ) as async_client:
+            return await asyncio.gather(
+                *(async_client.get('/todos/?limit=5') for _ in range(5)),
+                async_client.get('/todos/?limit=6'),
+            )
+
+    responses = client.portal.call(fetch_concurrently)
+
+    assert [r.status_code for r in responses] == [200] * 6
+    assert len({r.content for r in responses[:5]}) == 1
+    assert renders == 2
+    assert list_flights.coalesced == coalesced + 4
+    assert list_flights.stats()['in_flight'] == 0
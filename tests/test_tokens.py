@@ -0,0 +1,72 @@
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from freezegun import freeze_time
+from jose import JWTError
+
+from fast_zero.tokens import TokenVerifier
+
+
+def pem_pair(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+def test_verification_is_cached():
+    verifier = TokenVerifier('HS256', signing_key='secret')
+    token = verifier.encode({'sub': 'a', 'exp': 4102444800})
+
+    assert verifier.decode(token)['sub'] == 'a'
+    assert verifier.decode(token)['sub'] == 'a'
+    assert verifier.cache.stats()['hits'] == 1
+
+
+def test_cached_token_expires():
+    verifier = TokenVerifier('HS256', signing_key='secret')
+
+    with freeze_time('2024-01-08 00:00:00'):
+        token = verifier.encode({'sub': 'a', 'exp': 1704672060})
+        verifier.decode(token)
+
+    with freeze_time('2024-01-08 00:01:01'):
+        with pytest.raises(JWTError):
+            verifier.decode(token)
+
+
+def test_rejects_tampered_token():
+    verifier = TokenVerifier('HS256', signing_key='secret')
+    other = TokenVerifier('HS256', signing_key='other')
+    token = other.encode({'sub': 'a', 'exp': 4102444800})
+
+    with pytest.raises(JWTError):
+        verifier.decode(token)
+
+
+@pytest.mark.parametrize(
+    ('algorithm', 'private_key'),
+    [
+        ('RS256', rsa.generate_private_key(65537, 2048)),
+        ('EdDSA', ed25519.Ed25519PrivateKey.generate()),
+    ],
+)
+def test_asymmetric_verification_without_private_key(algorithm, private_key):
+    private_pem, public_pem = pem_pair(private_key)
+    issuer = TokenVerifier(algorithm, signing_key=private_pem)
+    edge = TokenVerifier(algorithm, verification_key=public_pem)
+
+    token = issuer.encode({'sub': 'a', 'exp': 4102444800})
+
+    assert edge.decode(token)['sub'] == 'a'
+    assert issuer.decode(token)['sub'] == 'a'
+    with pytest.raises(JWTError):
+        edge.encode({'sub': 'a'})
+    with pytest.raises(JWTError):
+        edge.decode(token[:-4] + 'AAAA')
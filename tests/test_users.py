@@ -1,3 +1,7 @@
+from sqlalchemy.exc import IntegrityError
+
+from fast_zero.etags import etag_responses
+from fast_zero.routes.users import duplicate_user
 from fast_zero.schemas import UserPublic
 
 
@@ -79,3 +83,159 @@ def test_delete_user_with_wrong_user(client, other_user, token):
     )
     assert response.status_code == 400
     assert response.json() == {'detail': 'Not enough permissions'}
+
+
+def test_create_user_statement_count(client, statements):
+    client.post(
+        '/users/',
+        json={
+            'username': 'alice',
+            'email': 'alice@example.com',
+            'password': 'secret',
+        },
+    )
+
+    assert len(statements) == 2
+    assert statements[0].startswith('INSERT INTO users')
+    assert statements[1].startswith('UPDATE counters')
+
+
+def test_update_user_statement_count(client, user, token, statements):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+    statements.clear()
+
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': 'bob',
+            'email': 'bob@example.com',
+            'password': 'mynewpassword',
+        },
+    )
+
+    assert len(statements) == 2
+    assert statements[0].startswith('UPDATE users')
+    assert statements[1].startswith('UPDATE counters')
+
+
+def test_read_users_selects_only_public_columns(client, user, statements):
+    client.get('/users/')
+
+    assert statements
+    assert all('password' not in statement for statement in statements)
+
+
+def test_read_users_not_modified(client, user, token):
+    labels = ('GET', '/users/', 'not_modified')
+    before = etag_responses.values.get(labels, 0)
+    response = client.get('/users/')
+
+    cached = client.get(
+        '/users/', headers={'If-None-Match': response.headers['ETag']}
+    )
+
+    assert cached.status_code == 304
+    assert etag_responses.values[labels] == before + 1
+
+
+def test_read_users_etag_changes_on_update(client, user, token):
+    etag = client.get('/users/').headers['ETag']
+
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'bob',
+            'email': 'bob@example.com',
+            'password': 'mynewpassword',
+        },
+    )
+    response = client.get('/users/', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_read_users_etag_ignores_todo_changes(client, user, token, statements):
+    etag = client.get('/users/').headers['ETag']
+    client.post(
+        '/todos/',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'title': 'a', 'description': 'b', 'state': 'draft'},
+    )
+    statements.clear()
+
+    response = client.get('/users/', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert len(statements) == 1
+    assert statements[0].startswith('SELECT counters.value')
+
+
+def test_read_users_etag_changes_on_create(client, user):
+    etag = client.get('/users/').headers['ETag']
+
+    client.post(
+        '/users/',
+        json={
+            'username': 'alice',
+            'email': 'alice@example.com',
+            'password': 'secret',
+        },
+    )
+    response = client.get('/users/', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+
+
+def test_create_user_duplicate_username(client, user):
+    response = client.post(
+        '/users/',
+        json={
+            'username': user.username.upper(),
+            'email': 'other@example.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Username already exists'}
+
+
+def test_create_user_duplicate_email(client, user):
+    response = client.post(
+        '/users/',
+        json={
+            'username': 'other',
+            'email': user.email.upper(),
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Email already exists'}
+
+
+def test_update_user_duplicate_email(client, user, other_user, token):
+    response = client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': user.username,
+            'email': other_user.email,
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Email already exists'}
+
+
+def test_duplicate_user_reraises_other_integrity_errors():
+    error = IntegrityError(
+        'INSERT INTO users', {}, Exception('NOT NULL constraint failed')
+    )
+
+    assert duplicate_user(error) is error